@@ -1,4 +1,12 @@
 import streamlit as st
+from utils.profiling import start_profiling, stop_profiling
+
+# 프로파일링 모드일 때 이번 실행 전체(아래의 import 포함)를 기록
+profile = start_profiling("home")
+
+from utils.metrics import track_page
+from utils.admin import is_admin_request, render_admin_page
+from utils.clients import warm_up_in_background
 
 # 페이지 설정 - 아이콘과 제목 설정
 st.set_page_config(
@@ -6,6 +14,17 @@ st.set_page_config(
     page_icon="🧑‍🏫",  # 브라우저 탭에 표시될 아이콘 (이모지 또는 이미지 파일 경로)
 )
 
+# 이 페이지에서 일어나는 외부 호출 시간을 'home' 페이지로 기록
+track_page("home")
+
+# 사용자가 도구를 고르는 동안 Google/OpenAI 모듈을 미리 불러 두어 첫 페이지를 빠르게 열도록 함
+warm_up_in_background()
+
+# 숨겨진 관리자 화면 (Home.py?admin=<토큰>)
+if is_admin_request():
+    render_admin_page()
+    st.stop()
+
 # Streamlit의 기본 메뉴와 푸터 숨기기
 hide_menu_style = """
     <style>
@@ -72,4 +91,20 @@ with col1:
         unsafe_allow_html=True
     )
 
+with col2:
+    st.markdown(
+        """
+        <h4>4. 교사용 활동 일괄 등록 도구</h4>
+        <a href="https://teachers.streamlit.app/bulk_import" target="_blank" style="text-decoration: none;">
+            <span style="font-size: 100px;">📦</span>
+            <div style="text-align: center; font-size: 20px;">클릭하세요</div>
+        </a>
+        <p>이 도구를 사용하여 학년 전체의 활동을 CSV 또는 엑셀 파일로 한 번에 등록할 수 있습니다. 모든 행을 한 번에 검사한 뒤 활동 유형별로 한 번에 저장합니다.</p>
+        """,
+        unsafe_allow_html=True
+    )
+
 # 이 페이지는 사용자가 각 도구의 목적과 기능을 이해하고, 필요에 따라 해당 도구를 선택해 사용할 수 있도록 안내하는 역할을 합니다.
+
+# 프로파일링 결과 저장 (꺼져 있으면 아무 일도 하지 않음)
+stop_profiling(profile)
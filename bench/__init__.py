@@ -0,0 +1 @@
+# 오프라인 성능 측정 도구 모음
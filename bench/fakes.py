@@ -0,0 +1,351 @@
+# 성능 측정용 가짜 Google Sheets / Drive / OpenAI 모듈
+# install_fakes() 를 호출하면 gspread, oauth2client, googleapiclient, httplib2, openai 대신
+# 같은 프로세스 안에서 동작하는 가짜 모듈이 사용되어, 네트워크 없이 페이지를 실행할 수 있습니다.
+# 모든 외부 호출은 FakeBackend.calls 에 이름별로 집계되고, 설정한 지연 시간만큼 기다립니다.
+import re
+import sys
+import threading
+import time
+import types
+from collections import Counter
+
+# 시트 제목 행 (A: 저장 시각, B: 활동 코드, C: 프롬프트, D: 이메일, E: 비밀번호)
+HEADER = ["timestamp", "setting_name", "prompt", "email", "password"]
+
+
+class FakeBackend:
+    def __init__(self, call_latency=0.0, row_latency=0.0, chat_latency=0.0, token_latency=0.0):
+        self.call_latency = call_latency  # 외부 호출 한 번의 왕복 시간(초)
+        self.row_latency = row_latency  # 행 하나를 주고받는 데 걸리는 시간(초)
+        self.chat_latency = chat_latency  # 채팅 응답의 첫 토큰까지 걸리는 시간(초)
+        self.token_latency = token_latency  # 스트리밍 토큰 사이의 시간(초)
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.spreadsheets = {}  # 스프레드시트 ID -> FakeSpreadsheet
+        self.folder_files = []  # Drive 폴더의 파일 목록 [{"id": ..., "name": ...}]
+
+    def record(self, name, rows=0):
+        with self.lock:
+            self.calls[name] += 1
+        if self.call_latency or rows:
+            time.sleep(self.call_latency + rows * self.row_latency)
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls = Counter()
+
+    def add_spreadsheet(self, spreadsheet_id, name, titles):
+        spreadsheet = FakeSpreadsheet(self, spreadsheet_id, name, titles)
+        self.spreadsheets[spreadsheet_id] = spreadsheet
+        self.folder_files.append({"id": spreadsheet_id, "name": name})
+        return spreadsheet
+
+
+class _Response:
+    # gspread APIError 가 참조하는 응답 객체
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class FakeWorksheet:
+    _next_id = 0
+
+    def __init__(self, backend, spreadsheet, title):
+        FakeWorksheet._next_id += 1
+        self.backend = backend
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = FakeWorksheet._next_id
+        self.rows = [list(HEADER)]
+        self.lock = threading.Lock()
+
+    def _check(self):
+        if self.spreadsheet.id not in self.backend.spreadsheets:
+            raise sys.modules["gspread"].exceptions.APIError(_Response(404))
+
+    def seed(self, rows):
+        # 측정 전에 행을 미리 채움 (호출 수에 포함하지 않음)
+        self.rows.extend([list(row) for row in rows])
+
+    def col_values(self, col):
+        self._check()
+        self.backend.record("sheets.col_values", len(self.rows))
+        with self.lock:
+            return [row[col - 1] if len(row) >= col else "" for row in self.rows]
+
+    def row_values(self, row):
+        self._check()
+        self.backend.record("sheets.row_values", 1)
+        with self.lock:
+            return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def get_all_values(self, *args, **kwargs):
+        self._check()
+        self.backend.record("sheets.get_all_values", len(self.rows))
+        with self.lock:
+            return [list(row) for row in self.rows]
+
+    def get_values(self, range_name=None, *args, **kwargs):
+        # "A{n}:F" 와 같이 시작 행만 지정한 범위를 지원
+        self._check()
+        start = 1
+        match = re.match(r"^[A-Z]+(\d+)", range_name or "")
+        if match:
+            start = int(match.group(1))
+        with self.lock:
+            rows = [list(row) for row in self.rows[start - 1:]]
+        self.backend.record("sheets.get_values", len(rows))
+        return rows
+
+    def get_all_records(self, *args, **kwargs):
+        rows = self.get_all_values()
+        return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+    def append_row(self, row, *args, **kwargs):
+        return self.append_rows([row])
+
+    def append_rows(self, rows, *args, **kwargs):
+        self._check()
+        self.backend.record("sheets.append_rows", len(rows))
+        with self.lock:
+            start = len(self.rows) + 1
+            self.rows.extend([list(row) for row in rows])
+            end = len(self.rows)
+        return {"updates": {"updatedRange": f"'{self.title}'!A{start}:F{end}", "updatedRows": len(rows)}}
+
+    def delete_rows(self, start, end=None):
+        self._check()
+        self.backend.record("sheets.delete_rows")
+        with self.lock:
+            del self.rows[start - 1:(end or start)]
+
+    def update(self, *args, **kwargs):
+        # update(values, range_name) 와 update(range_name, values) 두 가지 순서를 모두 지원
+        self._check()
+        values = kwargs.get("values")
+        range_name = kwargs.get("range_name")
+        for arg in args:
+            if isinstance(arg, str):
+                range_name = arg
+            else:
+                values = arg
+        match = re.match(r"^[A-Z]+(\d+)", range_name or "A1")
+        start = int(match.group(1))
+        self.backend.record("sheets.update", len(values))
+        with self.lock:
+            while len(self.rows) < start - 1 + len(values):
+                self.rows.append([""] * len(HEADER))
+            for offset, row in enumerate(values):
+                self.rows[start - 1 + offset] = list(row)
+
+    def batch_clear(self, ranges):
+        self._check()
+        self.backend.record("sheets.batch_clear")
+        with self.lock:
+            for range_name in ranges:
+                match = re.match(r"^[A-Z]+(\d+)", range_name)
+                if match:
+                    del self.rows[int(match.group(1)) - 1:]
+
+    def resize(self, rows=None, cols=None):
+        self._check()
+        self.backend.record("sheets.resize")
+        if rows is not None:
+            with self.lock:
+                del self.rows[rows:]
+
+
+class FakeSpreadsheet:
+    def __init__(self, backend, spreadsheet_id, name, titles):
+        self.backend = backend
+        self.id = spreadsheet_id
+        self.title = name
+        self._worksheets = [FakeWorksheet(backend, self, title) for title in titles]
+
+    def worksheets(self):
+        self.backend.record("sheets.worksheets")
+        return list(self._worksheets)
+
+    def worksheet(self, title):
+        self.backend.record("sheets.worksheet")
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise sys.modules["gspread"].exceptions.WorksheetNotFound(title)
+
+    def sheet(self, title):
+        # 측정 준비용 (호출 수에 포함하지 않음)
+        return next(worksheet for worksheet in self._worksheets if worksheet.title == title)
+
+    def add_worksheet(self, title, rows=1000, cols=26):
+        self.backend.record("sheets.add_worksheet")
+        worksheet = FakeWorksheet(self.backend, self, title)
+        # 실제 API 처럼 새 워크시트는 비어 있음
+        worksheet.rows = []
+        self._worksheets.append(worksheet)
+        return worksheet
+
+    def batch_update(self, body):
+        # deleteDimension 요청(행 삭제)만 지원
+        self.backend.record("sheets.batch_update")
+        by_id = {worksheet.id: worksheet for worksheet in self._worksheets}
+        for request in body.get("requests", []):
+            dimension = request.get("deleteDimension", {}).get("range")
+            if dimension:
+                worksheet = by_id[dimension["sheetId"]]
+                with worksheet.lock:
+                    del worksheet.rows[dimension["startIndex"]:dimension["endIndex"]]
+        return {}
+
+
+class FakeGspreadClient:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open_by_key(self, key):
+        self.backend.record("sheets.open_by_key")
+        if key not in self.backend.spreadsheets:
+            raise sys.modules["gspread"].exceptions.SpreadsheetNotFound(key)
+        return self.backend.spreadsheets[key]
+
+
+class FakeCredentials:
+    def authorize(self, http):
+        return http
+
+    def refresh(self, http):
+        pass
+
+
+class _FakeDriveRequest:
+    def __init__(self, backend, query):
+        self.backend = backend
+        self.query = query
+
+    def execute(self, http=None, **kwargs):
+        self.backend.record("drive.files.list")
+        match = re.search(r"name='([^']*)'", self.query or "")
+        files = [f for f in self.backend.folder_files if match is None or f["name"] == match.group(1)]
+        return {"files": [dict(f) for f in files]}
+
+
+class _FakeDriveFiles:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def list(self, q=None, **kwargs):
+        return _FakeDriveRequest(self.backend, q)
+
+
+class FakeDriveService:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def files(self):
+        return _FakeDriveFiles(self.backend)
+
+
+class _Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class _FakeStream:
+    def __init__(self, backend, text):
+        self.backend = backend
+        self.text = text
+        self.closed = False
+
+    def __iter__(self):
+        for piece in re.findall(r"\S+\s*", self.text):
+            if self.closed:
+                return
+            if self.backend.token_latency:
+                time.sleep(self.backend.token_latency)
+            yield _Obj(choices=[_Obj(delta=_Obj(content=piece))])
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeCompletions:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def create(self, model=None, messages=None, stream=False, n=1, **kwargs):
+        self.backend.record("openai.chat.completions.create")
+        if self.backend.chat_latency:
+            time.sleep(self.backend.chat_latency)
+        topic = messages[-1]["content"] if messages else ""
+        texts = [f"가짜 프롬프트 {index + 1}: {topic} 에 대해 초등학생이 이해할 수 있도록 설명해 주세요." for index in range(n)]
+        if stream:
+            return _FakeStream(self.backend, texts[0])
+        return _Obj(choices=[_Obj(index=index, message=_Obj(content=text)) for index, text in enumerate(texts)])
+
+
+class FakeOpenAI:
+    def __init__(self, backend, api_key=None, **kwargs):
+        self.api_key = api_key
+        self.chat = _Obj(completions=_FakeCompletions(backend))
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install_fakes(backend):
+    # 외부 라이브러리 모듈을 가짜 모듈로 바꿔 넣음 (utils 를 import 하기 전에 호출해야 함)
+    class GSpreadException(Exception):
+        pass
+
+    class SpreadsheetNotFound(GSpreadException):
+        pass
+
+    class WorksheetNotFound(GSpreadException):
+        pass
+
+    class APIError(GSpreadException):
+        def __init__(self, response=None):
+            super().__init__(getattr(response, "status_code", response))
+            self.response = response
+
+    exceptions = _module(
+        "gspread.exceptions",
+        GSpreadException=GSpreadException,
+        SpreadsheetNotFound=SpreadsheetNotFound,
+        WorksheetNotFound=WorksheetNotFound,
+        APIError=APIError,
+    )
+    _module("gspread", authorize=lambda credentials: FakeGspreadClient(backend), exceptions=exceptions,
+            Worksheet=FakeWorksheet, Spreadsheet=FakeSpreadsheet)
+
+    service_account = _module(
+        "oauth2client.service_account",
+        ServiceAccountCredentials=_Obj(from_json_keyfile_dict=lambda info, scopes=None: FakeCredentials()),
+    )
+    _module("oauth2client", service_account=service_account)
+    _module("httplib2", Http=lambda *args, **kwargs: _Obj())
+
+    discovery = _module(
+        "googleapiclient.discovery",
+        build=lambda *args, **kwargs: FakeDriveService(backend),
+        build_from_document=lambda *args, **kwargs: FakeDriveService(backend),
+    )
+    _module("googleapiclient", discovery=discovery)
+
+    class OpenAIError(Exception):
+        pass
+
+    _module(
+        "openai",
+        OpenAI=lambda api_key=None, **kwargs: FakeOpenAI(backend, api_key=api_key),
+        OpenAIError=OpenAIError,
+        RateLimitError=type("RateLimitError", (OpenAIError,), {}),
+        APIConnectionError=type("APIConnectionError", (OpenAIError,), {}),
+        InternalServerError=type("InternalServerError", (OpenAIError,), {}),
+    )
+    return backend
@@ -0,0 +1,264 @@
+# 동시에 접속한 교사 수에 따른 처리량, 응답 시간, 스레드 수, 메모리 측정
+# 교사 세션 N 개를 각각 별도 스레드의 AppTest 로 동시에 실행하며, 세션마다
+# 샘플 프롬프트 선택 → 활동 코드 입력 → 저장 → 비밀번호로 조회 → 삭제 순서의 상호작용을 반복합니다.
+# Sheets/Drive/OpenAI 는 bench.fakes 의 가짜 모듈을 사용하므로 네트워크 없이 측정합니다.
+#
+# 사용법 (저장소 최상위 폴더에서 실행)
+#   python -m bench.load_test --sessions 1 5 10 20 --iterations 3 --call-latency 0.05 --json load_output.json
+#
+# 메모리는 tracemalloc 으로 잰 Python 객체 메모리의 최대 증가량을 세션 수로 나눈 값입니다.
+# tracemalloc 은 실행을 느리게 하므로 처리량과 응답 시간만 볼 때는 --no-memory 를 사용하세요.
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# AppTest 를 화면 없이 실행할 때 나오는 ScriptRunContext 경고 숨김
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+# (Streamlit 이 실행 중에 로그 수준을 다시 설정하므로 수준 대신 필터로 숨김)
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+    lambda record: "missing ScriptRunContext" not in record.getMessage()
+)
+
+from bench.fakes import FakeBackend, install_fakes  # noqa: E402
+from bench.run_bench import PAGES, SECRETS, _by_label, reset_backend  # noqa: E402
+
+# 스레드 수를 확인하는 간격(초)
+THREAD_SAMPLE_INTERVAL = 0.05
+
+
+def share_test_runtime():
+    # AppTest 는 실행할 때마다 전역 Runtime 과 st.secrets 를 바꿔 넣고 끝나면 되돌리므로,
+    # 여러 세션을 동시에 실행하면 먼저 끝난 세션이 다른 세션의 Runtime 을 지움
+    # 모든 세션이 함께 쓰는 Runtime 과 secrets 를 한 번만 설정하여 세션들이 서로 간섭하지 않도록 함
+    # 실행하는 동안 켜는 global.appTest 설정도 config.get_option 을 바꿔 넣는 방식이라 동시에 실행하면 꺼질 수 있으므로 한 번만 켜 둠
+    # 또 AppTest 는 실행마다 페이지를 새로 컴파일하므로 (여러 스레드가 동시에 컴파일하면 Python 3.11 에서 실패할 수 있음)
+    # 실제 서버처럼 한 번 컴파일한 코드를 모든 세션이 함께 사용
+    import contextlib
+    from unittest.mock import MagicMock
+
+    import streamlit as st
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.secrets import Secrets
+    from streamlit.testing.v1 import app_test
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+    shared_cache = ScriptCache()
+    get_bytecode = ScriptCache.get_bytecode
+    ScriptCache.get_bytecode = lambda self, script_path: get_bytecode(shared_cache, script_path)
+
+    secrets = Secrets()
+    secrets._secrets = SECRETS
+    st.secrets = secrets
+
+
+def percentile(values, percent):
+    # 가장 가까운 순위(nearest-rank) 방식의 백분위수
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+class Session:
+    # 교사 한 명의 상호작용을 차례로 실행하며 재실행(run)마다 걸린 시간을 기록
+    def __init__(self, number):
+        self.number = number
+        self.password = f"loadpw{number}x"
+        self.latencies = []  # (단계, 초)
+        self.errors = []
+
+    def _app(self, page):
+        from streamlit.testing.v1 import AppTest
+
+        # secrets 는 share_test_runtime 에서 모든 세션에 한 번만 설정
+        return AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=600)
+
+    def _run(self, step, app):
+        started = time.perf_counter()
+        app.run()
+        self.latencies.append((step, time.perf_counter() - started))
+        if app.exception:
+            raise RuntimeError(f"{step}: {app.exception[0].message}")
+        return app
+
+    def save(self, code):
+        app = self._app("vision")
+        self._run("open", app)
+        app.selectbox[1].select_index(1)
+        self._run("pick_sample", app)
+        # 활동 코드와 비밀번호는 폼 안에 있으므로 저장 버튼과 함께 제출됨
+        _by_label(app.text_input, "활동 코드").input(code)
+        _by_label(app.text_input, "🔒 Password").input(self.password)
+        _by_label(app.button, "💾").click()
+        self._run("save", app)
+
+    def search_and_delete(self, code):
+        app = self._app("search")
+        self._run("open_search", app)
+        _by_label(app.text_input, "🔑").input(self.password)
+        self._run("lookup", app)
+        target = [option for option in _by_label(app.multiselect, "삭제할").options if option.endswith(f"] {code}")]
+        _by_label(app.multiselect, "삭제할").set_value(target)
+        self._run("select_delete", app)
+        _by_label(app.button, "🗑️ 선택한").click()
+        self._run("delete", app)
+
+    def run(self, iterations, start_barrier):
+        start_barrier.wait()
+        for iteration in range(iterations):
+            code = f"load{self.number}n{iteration}"
+            try:
+                self.save(code)
+                self.search_and_delete(code)
+            except Exception as e:
+                self.errors.append(f"{type(e).__name__}: {e}")
+
+
+class ThreadSampler:
+    # 측정하는 동안 실행 중인 스레드 수의 최댓값을 기록
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="thread-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(THREAD_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_level(backend, sessions, iterations, size, measure_memory):
+    # 세션 sessions 개를 동시에 실행하고 결과를 요약
+    reset_backend(backend, size)
+    backend.reset_calls()
+    baseline_threads = threading.active_count()
+    if measure_memory:
+        tracemalloc.start()
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+
+    barrier = threading.Barrier(sessions + 1)
+    workers = [Session(number) for number in range(sessions)]
+    threads = [
+        threading.Thread(target=session.run, args=(iterations, barrier), name=f"load-session-{session.number}")
+        for session in workers
+    ]
+    with ThreadSampler() as sampler:
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    peak_memory = None
+    if measure_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1] - baseline_memory
+        tracemalloc.stop()
+
+    latencies = [seconds for session in workers for _, seconds in session.latencies]
+    by_step = {}
+    for session in workers:
+        for step, seconds in session.latencies:
+            by_step.setdefault(step, []).append(seconds)
+
+    return {
+        "sessions": sessions,
+        "size": size,
+        "interactions": len(latencies),
+        "errors": [error for session in workers for error in session.errors],
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "steps": {step: {"p50": percentile(values, 50), "p95": percentile(values, 95)} for step, values in by_step.items()},
+        "baseline_threads": baseline_threads,
+        "peak_threads": sampler.peak,
+        "memory_per_session": peak_memory / sessions if peak_memory is not None else None,
+        "calls": dict(backend.calls),
+    }
+
+
+def print_report(results):
+    print(f"{'sessions':>8} {'runs':>6} {'errors':>6} {'runs/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'threads':>8} {'KB/session':>10} {'calls':>6}")
+    for result in results:
+        memory = f"{result['memory_per_session'] / 1024:.0f}" if result["memory_per_session"] is not None else "-"
+        print(f"{result['sessions']:>8} {result['interactions']:>6} {len(result['errors']):>6} "
+              f"{result['throughput']:>8.1f} {result['p50'] * 1000:>8.1f} {result['p95'] * 1000:>8.1f} "
+              f"{result['p99'] * 1000:>8.1f} {result['peak_threads']:>8} {memory:>10} {sum(result['calls'].values()):>6}")
+
+    print()
+    print("단계별 응답 시간 (p50 / p95 ms)")
+    for result in results:
+        steps = ", ".join(
+            f"{step}={values['p50'] * 1000:.0f}/{values['p95'] * 1000:.0f}" for step, values in result["steps"].items()
+        )
+        print(f"{result['sessions']:>8}  {steps}")
+
+    for result in results:
+        for error in result["errors"][:3]:
+            print(f"[{result['sessions']} sessions] 오류: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동시 접속한 교사 수에 따른 처리량, 응답 시간, 스레드 수, 메모리 측정")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 5, 10, 20], help="동시에 실행할 세션 수")
+    parser.add_argument("--iterations", type=int, default=3, help="세션마다 저장 → 조회 → 삭제를 반복하는 횟수")
+    parser.add_argument("--size", type=int, default=1000, help="시트별 행 수")
+    parser.add_argument("--call-latency", type=float, default=0.0, help="외부 호출 한 번의 지연 시간(초)")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="행 하나를 주고받는 지연 시간(초)")
+    parser.add_argument("--chat-latency", type=float, default=0.0, help="채팅 응답의 지연 시간(초)")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 으로 메모리를 재지 않음")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("AITOOLMAKER_DATA_DIR", tempfile.mkdtemp(prefix="aitoolmaker-load-"))
+    backend = install_fakes(FakeBackend(args.call_latency, args.row_latency, args.chat_latency))
+    share_test_runtime()
+
+    results = [
+        run_level(backend, sessions, args.iterations, args.size, not args.no_memory)
+        for sessions in args.sessions
+    ]
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
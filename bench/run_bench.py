@@ -0,0 +1,242 @@
+# 페이지별 재실행 시간과 외부 호출 수 측정
+# Streamlit 의 AppTest 로 각 페이지를 화면 없이 실행하고, Sheets/Drive/OpenAI 는
+# bench.fakes 의 가짜 모듈로 바꿔서 네트워크 없이 측정합니다.
+#
+# 사용법 (저장소 최상위 폴더에서 실행)
+#   python -m bench.run_bench --sizes 1000 10000 100000 --call-latency 0.05 --json bench_output.json
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# AppTest 를 화면 없이 실행할 때 나오는 ScriptRunContext 경고 숨김
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+from bench.fakes import FakeBackend, install_fakes  # noqa: E402
+
+PAGES = {
+    "home": "Home.py",
+    "vision": "pages/1 vision(new).py",
+    "text": "pages/2 text gen(new).py",
+    "image": "pages/3 image gen.py",
+    "search": "pages/4 search delete.py",
+}
+SHEETS = ["시트1", "시트2", "시트3"]
+SPREADSHEET_ID = "bench-spreadsheet"
+SPREADSHEET_NAME = "bench-data"
+
+# 측정에 사용하는 secrets (속도 제한은 측정에 영향을 주지 않도록 크게 설정)
+SECRETS = {
+    "gcp": {"credentials": "{}"},
+    "google": {"spreadsheet_name": SPREADSHEET_NAME},
+    "api": {"keys": ["bench-key-1", "bench-key-2"]},
+    "rate_limit": {
+        "sheets_read_per_minute": 10 ** 9,
+        "sheets_write_per_minute": 10 ** 9,
+        "drive_per_minute": 10 ** 9,
+        "openai_per_minute": 10 ** 9,
+        "sheets_read_burst": 10 ** 6,
+        "sheets_write_burst": 10 ** 6,
+        "drive_burst": 10 ** 6,
+        "openai_burst": 10 ** 6,
+    },
+}
+
+# 비밀번호 하나당 행 수 (교사 한 명이 저장한 활동 수)
+ROWS_PER_PASSWORD = 20
+
+
+def make_rows(sheet, count):
+    prefix = sheet[-1]
+    return [
+        ["2024-01-01 09:00:00", f"s{prefix}code{i}", f"{sheet} 프롬프트 {i}", "", f"pw{i // ROWS_PER_PASSWORD}x"]
+        for i in range(count)
+    ]
+
+
+def reset_backend(backend, size):
+    # 가짜 스프레드시트를 size 행으로 다시 만들고 모든 캐시를 비움
+    import streamlit as st
+    from streamlit import logger
+
+    logger.set_log_level("error")
+
+    backend.spreadsheets.clear()
+    backend.folder_files.clear()
+    spreadsheet = backend.add_spreadsheet(SPREADSHEET_ID, SPREADSHEET_NAME, SHEETS)
+    for sheet in SHEETS:
+        spreadsheet.sheet(sheet).seed(make_rows(sheet, size))
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    data_dir = os.environ["AITOOLMAKER_DATA_DIR"]
+    shutil.rmtree(data_dir, ignore_errors=True)
+    os.makedirs(data_dir, exist_ok=True)
+
+
+def _by_label(elements, prefix):
+    for element in elements:
+        if element.label.startswith(prefix):
+            return element
+    raise LookupError(prefix)
+
+
+class Recorder:
+    # 한 번의 재실행(run)마다 걸린 시간과 외부 호출 수를 기록
+    def __init__(self, backend, page, size):
+        self.backend = backend
+        self.page = page
+        self.size = size
+        self.steps = []
+
+    def run(self, step, app):
+        self.backend.reset_calls()
+        started = time.perf_counter()
+        app.run()
+        elapsed = time.perf_counter() - started
+        if app.exception:
+            raise RuntimeError(f"{self.page}/{step}: {app.exception[0].message}")
+        self.steps.append({
+            "page": self.page,
+            "size": self.size,
+            "step": step,
+            "seconds": elapsed,
+            "calls": dict(self.backend.calls),
+        })
+        return app
+
+
+def scenario_home(app, rec):
+    rec.run("cold", app)
+    rec.run("rerun", app)
+
+
+def _open_app(page):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=600)
+    for section, values in SECRETS.items():
+        app.secrets[section] = values
+    return app
+
+
+def _delete_saved(rec, password, code):
+    # 조회/삭제 페이지에서 방금 저장한 활동을 찾아 삭제
+    app = _open_app("search")
+    rec.run("delete_open", app)
+    _by_label(app.text_input, "🔑").input(password)
+    rec.run("delete_lookup", app)
+    _select_and_delete(rec, app, code)
+
+
+def _select_and_delete(rec, app, code):
+    selector = _by_label(app.multiselect, "삭제할")
+    selector.set_value([option for option in selector.options if option.endswith(f"] {code}")])
+    rec.run("select_delete", app)
+    _by_label(app.button, "🗑️ 선택한").click()
+    rec.run("delete", app)
+
+
+def _prompt_page(app, rec):
+    rec.run("cold", app)
+    rec.run("rerun", app)
+    app.selectbox[0].select("직접 입력")
+    rec.run("select_method", app)
+
+    # 인공지능 도움 받기: 한 번에 받기와 스트리밍을 각각 측정 (주제가 다르므로 생성 캐시를 사용하지 않음)
+    app.selectbox[0].select("인공지능 도움 받기")
+    rec.run("select_ai", app)
+    _by_label(app.text_input, "📚").input("곰")
+    _by_label(app.checkbox, "⚡").uncheck()
+    _by_label(app.button, "✨").click()
+    rec.run("ai_generate", app)
+    _by_label(app.text_input, "📚").input("고래")
+    _by_label(app.checkbox, "⚡").check()
+    _by_label(app.button, "✨").click()
+    rec.run("ai_stream", app)
+
+    # 활동 코드와 비밀번호는 폼 안에 있으므로 입력만으로는 다시 실행되지 않고, 저장 버튼과 함께 제출됨
+    _by_label(app.text_input, "활동 코드").input("benchnew1")
+    _by_label(app.text_input, "🔒 Password").input("benchpw1")
+    _by_label(app.button, "💾").click()
+    rec.run("save", app)
+
+    _delete_saved(rec, "benchpw1", "benchnew1")
+
+
+def scenario_image(app, rec):
+    rec.run("cold", app)
+    rec.run("rerun", app)
+    _by_label(app.text_input, "🔑 활동 코드").input("benchnew3")
+    _by_label(app.text_input, "🖼️").input("곰")
+    _by_label(app.button, "💾").click()
+    rec.run("save", app)
+
+
+def scenario_search(app, rec):
+    rec.run("cold", app)
+    _by_label(app.text_input, "🔑").input("pw1x")
+    rec.run("lookup", app)
+    rec.run("rerun", app)
+    app.selectbox[0].select("텍스트 생성")
+    rec.run("switch_type", app)
+    _select_and_delete(rec, app, "s2code20")
+
+
+SCENARIOS = {
+    "home": scenario_home,
+    "vision": _prompt_page,
+    "text": _prompt_page,
+    "image": scenario_image,
+    "search": scenario_search,
+}
+
+
+def run_page(backend, page, size):
+    reset_backend(backend, size)
+    app = _open_app(page)
+    rec = Recorder(backend, page, size)
+    SCENARIOS[page](app, rec)
+    return rec.steps
+
+
+def print_report(results):
+    print(f"{'page':<8} {'rows':>7} {'step':<14} {'ms':>9} {'calls':>6}  detail")
+    for step in results:
+        detail = ", ".join(f"{name.split('.', 1)[1]}={count}" for name, count in sorted(step["calls"].items()))
+        print(f"{step['page']:<8} {step['size']:>7} {step['step']:<14} {step['seconds'] * 1000:>9.1f} "
+              f"{sum(step['calls'].values()):>6}  {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지별 재실행 시간과 외부 호출 수 측정")
+    parser.add_argument("--pages", nargs="+", default=list(PAGES), choices=list(PAGES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000], help="시트별 행 수")
+    parser.add_argument("--call-latency", type=float, default=0.0, help="외부 호출 한 번의 지연 시간(초)")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="행 하나를 주고받는 지연 시간(초)")
+    parser.add_argument("--chat-latency", type=float, default=0.0, help="채팅 응답의 지연 시간(초)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("AITOOLMAKER_DATA_DIR", tempfile.mkdtemp(prefix="aitoolmaker-bench-"))
+    backend = install_fakes(FakeBackend(args.call_latency, args.row_latency, args.chat_latency))
+
+    results = []
+    for size in args.sizes:
+        for page in args.pages:
+            results.extend(run_page(backend, page, size))
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
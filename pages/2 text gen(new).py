@@ -1,10 +1,21 @@
 import streamlit as st
-from openai import OpenAI
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from googleapiclient.discovery import build
+from utils.profiling import start_profiling, stop_profiling
+
+# 프로파일링 모드일 때 이번 실행 전체(아래의 import 포함)를 기록
+profile = start_profiling("text")
+
+import contextlib
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
-import json
+
+from utils.metrics import track_page
+from utils.clients import get_openai_client
+from utils.executor import call_timeout, submit
+from utils.generation import CANDIDATE_COUNT, generate_candidates, generate_prompt, stream_prompt
+from utils.sheets import is_not_found
+from utils.code_index import get_code_index
+from utils.save_queue import get_save_queue, COMMITTED
 
 # 페이지 설정 - 아이콘과 제목 설정
 st.set_page_config(
@@ -12,6 +23,9 @@ st.set_page_config(
     page_icon="🧑‍🏫",  # 브라우저 탭에 표시될 아이콘 (이모지 또는 이미지 파일 경로)
 )
 
+# 이 페이지에서 일어나는 외부 호출 시간을 'text' 페이지로 기록
+track_page("text")
+
 # Streamlit의 배경색 변경
 background_color = "#E0F7FA"  # 파스텔 블루
 
@@ -53,50 +67,45 @@ hide_menu_style = """
 st.markdown(hide_menu_style, unsafe_allow_html=True)
 st.markdown(page_bg_css, unsafe_allow_html=True)
 
-# OpenAI API 클라이언트 초기화
-client = OpenAI(api_key=st.secrets["api"]["keys"][0])
+# 공용 OpenAI 클라이언트는 공용 스레드 풀에서 만들기 시작하고 (서버 프로세스당 한 번만 생성되어 모든 세션이 공유),
+# 그동안 제목과 안내를 먼저 표시한 뒤 서버 데이터를 불러옴
+client_future = submit(get_openai_client)
 
-# Google Sheets 및 Google Drive API 인증 설정
-credentials_dict = json.loads(st.secrets["gcp"]["credentials"])
-credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_dict, [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/drive",
-    "https://www.googleapis.com/auth/spreadsheets"
-])
-gc = gspread.authorize(credentials)
+# 이 페이지의 활동(텍스트 생성)을 저장하는 시트
+sheet_name = "시트2"
 
-# Google Drive API 클라이언트 생성
-drive_service = build('drive', 'v3', credentials=credentials)
+# 교사용 인터페이스
+st.title("🎓 교사용 프롬프트 생성 도구")
 
-# 폴더 ID와 스프레드시트 이름 설정
-folder_id = "1xJHiTJWXkeIhEOFBX2WyCb4fTQtGOIY-"
-spreadsheet_name = st.secrets["google"]["spreadsheet_name"]
+st.markdown("""
+**안내:** 이 도구를 사용하여 교육 활동에 필요한 프롬프트를 쉽게 생성할 수 있습니다. 다음 중 하나의 방법을 선택하세요:
+1. **샘플 프롬프트 이용하기**: 미리 준비된 샘플 프롬프트를 사용해 보세요.
+2. **직접 프롬프트 만들기**: 프롬프트를 직접 작성하세요.
+3. **인공지능 도움받기**: 인공지능의 도움을 받아 프롬프트를 생성하세요.
+4. **학생용 앱과 연동**: 이곳에서 저장한 프롬프트는 [학생용 앱](https://students.streamlit.app/)에서 불러와 안전하게 AI를 사용할 수 있습니다.
+""")
 
-# 폴더 내의 스프레드시트 파일 검색
+# 서버 데이터의 활동 코드 색인 불러오기
+# 스프레드시트 ID 와 워크시트, 활동 코드 색인은 캐시되어 다음 실행부터는 검색하지 않음
 with st.spinner('🔍 서버 데이터를 검색 중입니다...'):
-    query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name='{spreadsheet_name}'"
-    results = drive_service.files().list(q=query).execute()
-    items = results.get('files', [])
+    try:
+        code_index = get_code_index()
+    except Exception as e:
+        # 스프레드시트나 워크시트를 찾을 수 없는 경우만 안내하고, 나머지 오류는 그대로 표시
+        if not is_not_found(e):
+            raise
+        code_index = None
+
+# 서버 데이터를 불러오는 동안 함께 만든 OpenAI 클라이언트
+# 제한 시간 안에 준비되지 않으면 인공지능 도움 받기만 건너뛰고 나머지 기능은 그대로 사용
+try:
+    client = client_future.result(timeout=call_timeout())
+except FutureTimeoutError:
+    client = None
 
-if not items:
+if code_index is None:
     st.error('❌ 해당 폴더 내에서 서버 데이터를 찾을 수 없습니다.')
 else:
-    # 스프레드시트 ID로 열기
-    spreadsheet_id = items[0]['id']
-    spreadsheet = gc.open_by_key(spreadsheet_id)
-    worksheet = spreadsheet.worksheet("시트2")
-
-    # 교사용 인터페이스
-    st.title("🎓 교사용 프롬프트 생성 도구")
-
-    st.markdown("""
-    **안내:** 이 도구를 사용하여 교육 활동에 필요한 프롬프트를 쉽게 생성할 수 있습니다. 다음 중 하나의 방법을 선택하세요:
-    1. **샘플 프롬프트 이용하기**: 미리 준비된 샘플 프롬프트를 사용해 보세요.
-    2. **직접 프롬프트 만들기**: 프롬프트를 직접 작성하세요.
-    3. **인공지능 도움받기**: 인공지능의 도움을 받아 프롬프트를 생성하세요.
-    4. **학생용 앱과 연동**: 이곳에서 저장한 프롬프트는 [학생용 앱](https://students.streamlit.app/)에서 불러와 안전하게 AI를 사용할 수 있습니다.
-    """)
-
     # 샘플 프롬프트 목록
     sample_prompts = {
         "사회시간 - 백과사전 글 쉽게 설명하기": "네이버 백과사전에서 가져온 글을 초등학교 3학년이 이해할 수 있도록 쉽게 설명해 주세요.",
@@ -138,83 +147,174 @@ else:
         st.session_state.direct_prompt = st.text_area("✏️ 직접 입력할 프롬프트:", example_prompt, height=300)
         st.session_state.final_prompt = st.session_state.direct_prompt
 
-    # 인공지능 도움 받기
+    # 인공지능 도움 받기 (OpenAI 클라이언트를 제한 시간 안에 만들지 못한 경우 안내만 표시)
+    elif prompt_method == "인공지능 도움 받기" and client is None:
+        st.error("⚠️ 프롬프트 생성 중 오류가 발생했습니다: 인공지능 서버 연결 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요.")
+
     elif prompt_method == "인공지능 도움 받기":
         input_topic = st.text_input("📚 프롬프트 주제 또는 키워드를 입력하세요:", "")
+        stream_mode = st.checkbox("⚡ 만들어지는 내용을 바로 보기", value=True)
+        candidate_mode = st.checkbox(f"🗂️ 후보 {CANDIDATE_COUNT}개를 한 번에 받아 비교하기", value=False)
+        regenerate = st.checkbox("🔄 이전에 만든 결과 대신 새로 만들기", value=False)
+
+        # 생성 도중 중지한 경우 안내
+        if st.session_state.pop("ai_prompt_stopped", False):
+            st.info("⏹️ 프롬프트 생성을 중지했습니다. 그때까지 만들어진 내용을 살펴보고 수정하세요.")
 
         if st.button("✨ 인공지능아 프롬프트를 만들어줘"):
             if input_topic.strip() == "":
                 st.error("⚠️ 주제를 입력하세요.")
+            elif candidate_mode:
+                # 한 번의 요청으로 여러 후보를 받아 아래에 나란히 표시
+                with st.spinner('🧠 후보 프롬프트를 생성 중입니다...'):
+                    try:
+                        st.session_state.ai_candidates = generate_candidates(client, "text", input_topic, refresh=regenerate)
+                        if not st.session_state.ai_candidates:
+                            st.error("⚠️ 프롬프트 생성에 실패했습니다. 다시 시도해 주세요.")
+
+                    except Exception as e:
+                        st.error(f"⚠️ 프롬프트 생성 중 오류가 발생했습니다: {e}")
+                        st.session_state.ai_candidates = []
+            elif stream_mode:
+                st.session_state.ai_candidates = []
+                # 생성되는 내용을 실시간으로 표시
+                # 중지 버튼을 누르면 Streamlit 이 스크립트를 다시 실행하면서 생성이 멈추고,
+                # 그때까지 받은 내용이 프롬프트로 저장됨
+                st.session_state.ai_prompt = ""
+                st.button("⏹️ 생성 중지")
+                output = st.empty()
+                partial = ""
+                completed = False
+                try:
+                    with contextlib.closing(stream_prompt(client, "text", input_topic, refresh=regenerate)) as pieces:
+                        for piece in pieces:
+                            partial += piece
+                            output.markdown(partial + "▌")
+                    completed = True
+                    output.empty()
+                    if partial.strip():
+                        st.session_state.ai_prompt = partial.strip()
+                    else:
+                        st.error("⚠️ 프롬프트 생성에 실패했습니다. 다시 시도해 주세요.")
+
+                except Exception as e:
+                    completed = True
+                    st.error(f"⚠️ 프롬프트 생성 중 오류가 발생했습니다: {e}")
+                    st.session_state.ai_prompt = ""
+
+                finally:
+                    if not completed:
+                        st.session_state.ai_prompt = partial.strip()
+                        st.session_state.ai_prompt_stopped = True
             else:
+                st.session_state.ai_candidates = []
                 with st.spinner('🧠 프롬프트를 생성 중입니다...'):
                     try:
-                        response = client.chat.completions.create(
-                            model="gpt-4o-mini",  # 적절한 GPT 모델을 선택
-                            messages=[
-                                {"role": "system", "content": "당신은 text generation api를 이용하여 교육 목적으로 시스템 프롬프트를 만드는 것을 돕는 AI입니다."},
-                                {"role": "user", "content": f"프롬프트의 주제는: {input_topic}입니다. 이 주제를 바탕으로 Text Generation API를 사용하여 창의적이고 교육적인 시스템 프롬프트를 생성해 주세요."}
-                            ]
-                        )
-                        
-                        if response.choices and response.choices[0].message.content:
-                            st.session_state.ai_prompt = response.choices[0].message.content.strip()
-                        else:
+                        st.session_state.ai_prompt = generate_prompt(client, "text", input_topic, refresh=regenerate)
+                        if not st.session_state.ai_prompt:
                             st.error("⚠️ 프롬프트 생성에 실패했습니다. 다시 시도해 주세요.")
-                            st.session_state.ai_prompt = ""
 
                     except Exception as e:
                         st.error(f"⚠️ 프롬프트 생성 중 오류가 발생했습니다: {e}")
                         st.session_state.ai_prompt = ""
 
+        # 후보 프롬프트를 나란히 보여주고, 고른 후보를 아래에서 수정할 수 있도록 함
+        candidates = st.session_state.get("ai_candidates", [])
+        if candidates:
+            st.subheader("🗂️ 후보 프롬프트")
+            for i, (column, candidate) in enumerate(zip(st.columns(len(candidates)), candidates)):
+                with column:
+                    st.markdown(f"**후보 {i + 1}**")
+                    st.write(candidate)
+                    if st.button("✅ 이 프롬프트 선택", key=f"pick_candidate_{i}"):
+                        st.session_state.ai_prompt = candidate
+
         # 인공지능 프롬프트가 생성된 경우에만 표시
         if st.session_state.ai_prompt:
             st.session_state.ai_prompt = st.text_area("✏️ 인공지능이 만든 프롬프트를 살펴보고 직접 수정하세요:", 
                                                       value=st.session_state.ai_prompt, height=300)
             st.session_state.final_prompt = st.session_state.ai_prompt
 
-    # 활동 코드 입력
+    # 활동 코드, Email, Password 입력과 저장은 하나의 폼으로 묶어,
+    # 입력하는 동안에는 스크립트가 다시 실행되지 않고 저장 버튼을 누를 때만 검사함
     if st.session_state.final_prompt:
-        st.subheader("🔑 활동 코드 설정")
-        activity_code = st.text_input("활동 코드를 입력하세요", value=st.session_state.get('activity_code', '')).strip()
+        with st.form("save_form"):
+            st.subheader("🔑 활동 코드 설정")
+            activity_code = st.text_input("활동 코드를 입력하세요", value=st.session_state.get('activity_code', '')).strip()
 
-        if activity_code.isdigit():
-            st.error("⚠️ 활동 코드는 숫자만으로 입력할 수 없습니다. 다시 입력해주세요.")
-            activity_code = ""  # 숫자만 입력된 경우 초기화
-        elif activity_code in worksheet.col_values(2):
-            st.error("⚠️ 이미 사용된 코드입니다. 다른 코드를 입력해주세요.")
-            activity_code = ""  # 중복된 경우 초기화
-        else:
-            st.session_state['activity_code'] = activity_code
+            # Email 및 Password 입력
+            email = st.text_input("📧 Email (선택사항) 학생의 생성결과물을 받아볼 수 있습니다.", value=st.session_state.get('email', '')).strip()
+            password = st.text_input("🔒 Password (선택사항) 저장한 프롬프트를 조회, 삭제할 수 있습니다.", value=st.session_state.get('password', ''), type="password").strip()
+
+            st.markdown("**[https://students.streamlit.app/](https://students.streamlit.app/)** 에서 학생들이 이 활동 코드를 입력하면 해당 프롬프트를 불러올 수 있습니다.")
 
-        # Email 및 Password 입력
-        email = st.text_input("📧 Email (선택사항) 학생의 생성결과물을 받아볼 수 있습니다.", value=st.session_state.get('email', '')).strip()
-        password = st.text_input("🔒 Password (선택사항) 저장한 프롬프트를 조회, 삭제할 수 있습니다.", value=st.session_state.get('password', ''), type="password").strip()
+            submitted = st.form_submit_button("💾 프롬프트를 서버에 저장")
+    else:
+        # 프롬프트가 없을 때도 저장 버튼은 표시하고, 누르면 안내
+        submitted = st.button("💾 프롬프트를 서버에 저장")
+        activity_code = email = password = ""
 
-        st.markdown("**[https://students.streamlit.app/](https://students.streamlit.app/)** 에서 학생들이 이 활동 코드를 입력하면 해당 프롬프트를 불러올 수 있습니다.")
+    # 저장 요청 키: 입력한 내용이 바뀔 때만 새로 만들어 행과 함께 기록하므로,
+    # 저장 버튼을 두 번 눌러 같은 내용이 다시 제출되어도 저장 대기열과 저장소에서 한 번만 기록됨
+    save_inputs = [activity_code, st.session_state.final_prompt, email, password]
+    if st.session_state.get("save_inputs") != save_inputs:
+        st.session_state.save_inputs = save_inputs
+        st.session_state.save_key = uuid.uuid4().hex
+
+    if submitted:
+        # 같은 키의 요청이 이미 접수되었고 코드가 아직 사용 중이면 같은 저장 요청이 다시 제출된 것
+        # (코드가 그사이 삭제되었으면 같은 내용이라도 새 저장 요청으로 처리)
+        resubmitted = False
+        if get_save_queue().status(st.session_state.save_key) is not None:
+            resubmitted = code_index.is_taken(activity_code)
+            if not resubmitted:
+                st.session_state.save_key = uuid.uuid4().hex
 
-    # 서버 저장 버튼은 항상 표시되며, 입력 검증 후 동작
-    if st.button("💾 프롬프트를 서버에 저장"):
         if not st.session_state.final_prompt.strip():
             st.error("⚠️ 프롬프트가 없습니다. 먼저 프롬프트를 생성하세요.")
+        elif activity_code.isdigit():
+            st.error("⚠️ 활동 코드는 숫자만으로 입력할 수 없습니다. 다시 입력해주세요.")
         elif not activity_code:
             st.error("⚠️ 활동 코드를 입력하세요.")
+        elif code_index.is_taken(activity_code) and not resubmitted:  # 모든 활동 유형의 코드와 비교 (메모리에서 확인)
+            st.error("⚠️ 이미 사용된 코드입니다. 다른 코드를 입력해주세요.")
         elif password and password.isnumeric():
             st.error("⚠️ 비밀번호는 숫자만 입력할 수 없습니다. 영문 또는 영문+숫자 조합을 사용하세요.")
         else:
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with st.spinner('💾 데이터를 저장하는 중입니다...'):
-                st.info("✅ 모든 입력값이 유효합니다. 서버에 데이터를 추가하는 중입니다...")
+            # 활동 코드를 먼저 예약하여 다른 교사가 같은 코드로 동시에 저장하지 못하도록 함
+            # (다시 제출된 요청은 이미 예약이 확정되었으므로 예약하지 않음)
+            reservation = None if resubmitted else code_index.reserve(activity_code)
+            if reservation is None and not resubmitted:
+                st.error("⚠️ 이미 사용된 코드입니다. 다른 코드를 입력해주세요.")
+            else:
+                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                with st.spinner('💾 데이터를 저장하는 중입니다...'):
+                    st.info("✅ 모든 입력값이 유효합니다. 서버에 데이터를 추가하는 중입니다...")
 
-                try:
-                    worksheet.append_row([current_time, activity_code, st.session_state.final_prompt, email, password])
-                    st.success("🎉 프롬프트가 성공적으로 저장되었습니다.")
-                    # 세션 상태 초기화
-                    st.session_state.direct_prompt = ""
-                    st.session_state.ai_prompt = ""
-                    st.session_state.final_prompt = ""
-                    st.session_state.activity_code = ""
-                    st.session_state.email = ""
-                    st.session_state.password = ""
+                    try:
+                        # 저장 대기열에 넣으면 백그라운드에서 다른 저장 요청과 묶어 한 번에 기록됨
+                        status = get_save_queue().submit(sheet_name, [current_time, activity_code, st.session_state.final_prompt, email, password, st.session_state.save_key])
+                        if reservation:
+                            code_index.commit(reservation)
+                        if status == COMMITTED:
+                            st.success("🎉 프롬프트가 성공적으로 저장되었습니다.")
+                        else:
+                            st.success("📨 저장 요청이 접수되었습니다. 잠시 후 서버에 반영됩니다.")
 
-                except Exception as e:
-                    st.error(f"❌ 프롬프트 저장 중 오류가 발생했습니다: {e}")
+
+                        # 세션 상태 초기화
+                        st.session_state.direct_prompt = ""
+                        st.session_state.ai_prompt = ""
+                        st.session_state.ai_candidates = []
+                        st.session_state.final_prompt = ""
+                        st.session_state.activity_code = ""
+                        st.session_state.email = ""
+                        st.session_state.password = ""
+
+                    except Exception as e:
+                        if reservation:
+                            code_index.release(reservation)
+                        st.error(f"❌ 프롬프트 저장 중 오류가 발생했습니다: {e}")
+
+# 프로파일링 결과 저장 (꺼져 있으면 아무 일도 하지 않음)
+stop_profiling(profile)
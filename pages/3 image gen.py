@@ -1,9 +1,16 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from googleapiclient.discovery import build
+from utils.profiling import start_profiling, stop_profiling
+
+# 프로파일링 모드일 때 이번 실행 전체(아래의 import 포함)를 기록
+profile = start_profiling("image")
+
+import uuid
 from datetime import datetime
-import json
+
+from utils.metrics import track_page
+from utils.sheets import is_not_found
+from utils.code_index import get_code_index
+from utils.save_queue import get_save_queue, COMMITTED
 
 # 페이지 설정 - 아이콘과 제목 설정
 st.set_page_config(
@@ -11,6 +18,9 @@ st.set_page_config(
     page_icon="🧑‍🏫",  # 브라우저 탭에 표시될 아이콘 (이모지 또는 이미지 파일 경로)
 )
 
+# 이 페이지에서 일어나는 외부 호출 시간을 'image' 페이지로 기록
+track_page("image")
+
 # Streamlit의 배경색 변경
 background_color = "#C5E1A5"  # 파스텔 그린
 
@@ -52,88 +62,105 @@ hide_menu_style = """
 st.markdown(hide_menu_style, unsafe_allow_html=True)
 st.markdown(page_bg_css, unsafe_allow_html=True)
 
-# Google Sheets 및 Google Drive API 인증 설정
-credentials_dict = json.loads(st.secrets["gcp"]["credentials"])
-credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_dict, [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/drive",
-    "https://www.googleapis.com/auth/spreadsheets"
-])
-gc = gspread.authorize(credentials)
+# 이 페이지의 활동(이미지 생성)을 저장하는 시트
+sheet_name = "시트3"
 
-# Google Drive API 클라이언트 생성
-drive_service = build('drive', 'v3', credentials=credentials)
+# 교사용 인터페이스
+st.title("🎨 교사용 이미지 생성 프롬프트 도구")
 
-# 폴더 ID와 스프레드시트 이름 설정
-folder_id = "1xJHiTJWXkeIhEOFBX2WyCb4fTQtGOIY-"  # 교사 페이지에 맞는 폴더 ID로 변경
-spreadsheet_name = st.secrets["google"]["spreadsheet_name"]
+st.markdown("""
+**안내:** 이 도구를 사용하여 교육 활동에 필요한 이미지 생성 프롬프트를 직접 입력하고 저장할 수 있습니다. 아래의 단계를 따라 입력해 주세요.
+1. **활동 코드**: 학생들이 입력할 고유 코드를 설정합니다. (숫자만으로 구성될 수 없습니다. 문자 또는 문자+숫자 조합만 허용됩니다.)
+2. **이미지 대상**: 생성하고자 하는 이미지의 대상을 간단하게 입력합니다.
+3. **프롬프트 저장**: 입력한 프롬프트를 저장하여 서버에 추가합니다.
+4. **학생용 앱과 연동**: 이곳에서 저장한 프롬프트는 [학생용 앱](https://students.streamlit.app/)에서 불러와 안전하게 AI를 사용할 수 있습니다.
+""")
 
-# 폴더 내의 스프레드시트 파일 검색
+# 서버 데이터의 활동 코드 색인 불러오기
+# 스프레드시트 ID 와 워크시트, 활동 코드 색인은 캐시되어 다음 실행부터는 검색하지 않음
 with st.spinner('🔍 서버 데이터를 검색 중입니다...'):
-    query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name='{spreadsheet_name}'"
-    results = drive_service.files().list(q=query).execute()
-    items = results.get('files', [])
-
-if not items:
+    try:
+        code_index = get_code_index()
+    except Exception as e:
+        # 스프레드시트나 워크시트를 찾을 수 없는 경우만 안내하고, 나머지 오류는 그대로 표시
+        if not is_not_found(e):
+            raise
+        code_index = None
+
+if code_index is None:
     st.error('❌ 해당 폴더 내에서 서버 데이터를 찾을 수 없습니다.')
 else:
-    # 스프레드시트 ID로 열기
-    spreadsheet_id = items[0]['id']
-    spreadsheet = gc.open_by_key(spreadsheet_id)
-    worksheet = spreadsheet.worksheet("시트3")  # '시트3'에 데이터를 저장하도록 변경
-
-    # 교사용 인터페이스
-    st.title("🎨 교사용 이미지 생성 프롬프트 도구")
-
-    st.markdown("""
-    **안내:** 이 도구를 사용하여 교육 활동에 필요한 이미지 생성 프롬프트를 직접 입력하고 저장할 수 있습니다. 아래의 단계를 따라 입력해 주세요.
-    1. **활동 코드**: 학생들이 입력할 고유 코드를 설정합니다. (숫자만으로 구성될 수 없습니다. 문자 또는 문자+숫자 조합만 허용됩니다.)
-    2. **이미지 대상**: 생성하고자 하는 이미지의 대상을 간단하게 입력합니다.
-    3. **프롬프트 저장**: 입력한 프롬프트를 저장하여 서버에 추가합니다.
-    4. **학생용 앱과 연동**: 이곳에서 저장한 프롬프트는 [학생용 앱](https://students.streamlit.app/)에서 불러와 안전하게 AI를 사용할 수 있습니다.
-    """)
-
-    # 기존 활동 코드 리스트 가져오기
-    existing_codes = worksheet.col_values(2)  # 스프레드시트에서 두 번째 열의 모든 값을 가져옴
-
-    # 활동 코드 입력 (숫자만으로 입력된 경우 오류 처리 및 중복 검사)
-    activity_code = st.text_input("🔑 활동 코드 입력", value=st.session_state.get('activity_code', '')).strip()
-
-    if activity_code.isdigit():
-        st.error("⚠️ 활동 코드는 숫자만으로 구성될 수 없습니다. 문자 또는 문자+숫자 조합을 사용하세요.")
-        activity_code = ""  # 숫자만 입력된 경우 초기화
-    elif activity_code in existing_codes:
-        st.error("⚠️ 이미 사용된 코드입니다. 다른 코드를 입력해주세요.")
-        activity_code = ""  # 중복된 경우 초기화
-    else:
-        st.session_state['activity_code'] = activity_code
-
-    # 교사가 이미지 대상을 입력
-    input_topic = st.text_input("🖼️ 이미지 대상을 간단하게 입력하세요 (예: '곰', '나무', '산'): ", "")
-
-    # Email 및 Password 입력
-    email = st.text_input("📧 Email (선택사항) 학생의 생성결과물을 받아볼 수 있습니다.", value=st.session_state.get('email', '')).strip()
-    password = st.text_input("🔒 Password (선택사항) 저장한 프롬프트를 조회, 삭제할 수 있습니다.", value=st.session_state.get('password', ''), type="password").strip()
-
-    # 프롬프트 바로 저장
-    if st.button("💾 프롬프트를 서버에 저장") and activity_code:
-        if input_topic:
-            if password and password.isnumeric():
-                st.error("⚠️ 비밀번호는 숫자만 입력할 수 없습니다. 영문 또는 영문+숫자 조합을 사용하세요.")
+    # 모든 입력과 저장 버튼을 하나의 폼으로 묶어,
+    # 입력하는 동안에는 스크립트가 다시 실행되지 않고 저장 버튼을 누를 때만 검사함
+    with st.form("save_form"):
+        activity_code = st.text_input("🔑 활동 코드 입력", value=st.session_state.get('activity_code', '')).strip()
+
+        # 교사가 이미지 대상을 입력
+        input_topic = st.text_input("🖼️ 이미지 대상을 간단하게 입력하세요 (예: '곰', '나무', '산'): ", "")
+
+        # Email 및 Password 입력
+        email = st.text_input("📧 Email (선택사항) 학생의 생성결과물을 받아볼 수 있습니다.", value=st.session_state.get('email', '')).strip()
+        password = st.text_input("🔒 Password (선택사항) 저장한 프롬프트를 조회, 삭제할 수 있습니다.", value=st.session_state.get('password', ''), type="password").strip()
+
+        submitted = st.form_submit_button("💾 프롬프트를 서버에 저장")
+
+    # 프롬프트 바로 저장 (숫자만으로 입력된 코드와 중복 코드는 저장 버튼을 누를 때 검사)
+    # 저장 요청 키: 입력한 내용이 바뀔 때만 새로 만들어 행과 함께 기록하므로,
+    # 저장 버튼을 두 번 눌러 같은 내용이 다시 제출되어도 저장 대기열과 저장소에서 한 번만 기록됨
+    save_inputs = [activity_code, input_topic, email, password]
+    if st.session_state.get("save_inputs") != save_inputs:
+        st.session_state.save_inputs = save_inputs
+        st.session_state.save_key = uuid.uuid4().hex
+
+    if submitted:
+        # 같은 키의 요청이 이미 접수되었고 코드가 아직 사용 중이면 같은 저장 요청이 다시 제출된 것
+        # (코드가 그사이 삭제되었으면 같은 내용이라도 새 저장 요청으로 처리)
+        resubmitted = False
+        if get_save_queue().status(st.session_state.save_key) is not None:
+            resubmitted = code_index.is_taken(activity_code)
+            if not resubmitted:
+                st.session_state.save_key = uuid.uuid4().hex
+
+        if activity_code.isdigit():
+            st.error("⚠️ 활동 코드는 숫자만으로 구성될 수 없습니다. 문자 또는 문자+숫자 조합을 사용하세요.")
+        elif not activity_code:
+            st.error("⚠️ 활동 코드를 입력하세요.")
+        elif code_index.is_taken(activity_code) and not resubmitted:  # 모든 활동 유형의 코드와 비교 (메모리에서 확인)
+            st.error("⚠️ 이미 사용된 코드입니다. 다른 코드를 입력해주세요.")
+        elif not input_topic:
+            st.error("⚠️ 이미지 대상을 입력하세요.")
+        elif password and password.isnumeric():
+            st.error("⚠️ 비밀번호는 숫자만 입력할 수 없습니다. 영문 또는 영문+숫자 조합을 사용하세요.")
+        else:
+            # 활동 코드를 먼저 예약하여 다른 교사가 같은 코드로 동시에 저장하지 못하도록 함
+            # (다시 제출된 요청은 이미 예약이 확정되었으므로 예약하지 않음)
+            reservation = None if resubmitted else code_index.reserve(activity_code)
+            if reservation is None and not resubmitted:
+                st.error("⚠️ 이미 사용된 코드입니다. 다른 코드를 입력해주세요.")
             else:
                 current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 with st.spinner('💾 데이터를 저장하는 중입니다...'):
                     st.info("✅ 모든 입력값이 유효합니다. 서버에 데이터를 추가하는 중입니다...")
 
                     try:
-                        worksheet.append_row([current_time, activity_code, input_topic, email, password])
-                        st.success("🎉 프롬프트가 성공적으로 저장되었습니다.")
+                        # 저장 대기열에 넣으면 백그라운드에서 다른 저장 요청과 묶어 한 번에 기록됨
+                        status = get_save_queue().submit(sheet_name, [current_time, activity_code, input_topic, email, password, st.session_state.save_key])
+                        if reservation:
+                            code_index.commit(reservation)
+                        if status == COMMITTED:
+                            st.success("🎉 프롬프트가 성공적으로 저장되었습니다.")
+                        else:
+                            st.success("📨 저장 요청이 접수되었습니다. 잠시 후 서버에 반영됩니다.")
+
                         # 세션 상태 초기화
                         st.session_state.activity_code = ""
                         st.session_state.email = ""
                         st.session_state.password = ""
 
                     except Exception as e:
+                        if reservation:
+                            code_index.release(reservation)
                         st.error(f"❌ 프롬프트 저장 중 오류가 발생했습니다: {e}")
-        else:
-            st.error("⚠️ 이미지 대상을 입력하세요.")
\ No newline at end of file
+
+# 프로파일링 결과 저장 (꺼져 있으면 아무 일도 하지 않음)
+stop_profiling(profile)
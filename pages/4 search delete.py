@@ -1,7 +1,14 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import json
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from utils.profiling import start_profiling, stop_profiling
+
+# 프로파일링 모드일 때 이번 실행 전체(아래의 import 포함)를 기록
+profile = start_profiling("search")
+
+from utils.metrics import track_page
+from utils.executor import call_timeout, submit
+from utils.storage import get_store, hash_password
+from utils.code_index import get_code_index
 
 # 페이지 설정 - 아이콘과 제목 설정
 st.set_page_config(
@@ -9,6 +16,9 @@ st.set_page_config(
     page_icon="🧑‍🏫",  # 브라우저 탭에 표시될 아이콘 (이모지 또는 이미지 파일 경로)
 )
 
+# 이 페이지에서 일어나는 외부 호출 시간을 'search' 페이지로 기록
+track_page("search")
+
 # Streamlit의 배경색 변경
 background_color = "#F3E5F5"  # 연한 라벤더
 
@@ -34,41 +44,37 @@ page_bg_css = f"""
 st.markdown(hide_menu_style, unsafe_allow_html=True)
 st.markdown(page_bg_css, unsafe_allow_html=True)
 
-# Google Sheets 인증 설정
-credentials_dict = json.loads(st.secrets["gcp"]["credentials"])
-credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_dict, [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/drive",
-    "https://www.googleapis.com/auth/spreadsheets"
-])
-gc = gspread.authorize(credentials)
-
-# 스프레드시트 열기
-spreadsheet = gc.open(st.secrets["google"]["spreadsheet_name"])
+# 활동 유형별 시트 (시트1: 비전, 시트2: 텍스트, 시트3: 그림생성)
+ACTIVITY_TYPES = {"이미지 분석": "시트1", "텍스트 생성": "시트2", "이미지 생성": "시트3"}
 
 # 교사용 인터페이스
 st.title("📄 교사용 프롬프트 조회/삭제 도구")
 
 # UI에서 활동 선택
-activity_type = st.selectbox("활동 유형을 선택하세요", ["이미지 분석", "텍스트 생성", "이미지 생성"])
+activity_type = st.selectbox("활동 유형을 선택하세요", list(ACTIVITY_TYPES))
 
 # 선택한 활동 유형에 따라 시트 설정
-if activity_type == "이미지 분석":
-    worksheet = spreadsheet.worksheet("시트1")  # 비전
-elif activity_type == "텍스트 생성":
-    worksheet = spreadsheet.worksheet("시트2")  # 텍스트
-elif activity_type == "이미지 생성":
-    worksheet = spreadsheet.worksheet("시트3")  # 그림생성
+sheet_name = ACTIVITY_TYPES[activity_type]
 
 # password 입력
 password = st.text_input("🔑 비밀번호('영문'+'숫자'조합)를 입력하세요", type="password")
 
 if password:
-    # password에 해당하는 모든 데이터 검색
-    records = worksheet.get_all_records()
-    filtered_records = [record for record in records if record.get('password') == password]
-
-    if filtered_records:
+    # 모든 활동 유형의 검색을 공용 스레드 풀에서 동시에 시작하고, 선택한 유형의 결과부터 표시
+    lookups = {
+        type_sheet: submit(get_store().list_by_password, type_sheet, password)
+        for type_sheet in ACTIVITY_TYPES.values()
+    }
+
+    # password에 해당하는 모든 데이터 검색 (제한 시간 안에 끝나지 않으면 None 으로 두고 목록 표시를 건너뜀)
+    try:
+        filtered_records = lookups[sheet_name].result(timeout=call_timeout())
+    except FutureTimeoutError:
+        filtered_records = None
+
+    if filtered_records is None:
+        st.error("❌ 데이터 조회 중 오류가 발생했습니다: 응답 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요.")
+    elif filtered_records:
         st.success(f"✅ 비밀번호: {password}에 대한 데이터를 찾았습니다.")
         st.subheader("📄 저장된 프롬프트 목록")
 
@@ -77,25 +83,65 @@ if password:
             st.write(f"**설정 이름 (Setting Name):** {record['setting_name']}")
             st.write(f"**프롬프트:** {record['prompt']}")
             st.write("---")
-
-        # 삭제할 setting_name 입력
-        setting_name_to_delete = st.text_input("삭제할 설정 이름을 입력하세요 (Setting Name)")
-
-        if setting_name_to_delete:
-            if st.button("🗑️ 삭제"):
-                # 특정 설정 이름 삭제
-                row_to_delete = None
-                for idx, record in enumerate(filtered_records):
-                    if record.get('setting_name') == setting_name_to_delete:
-                        row_to_delete = idx + 2  # 실제 시트에서의 행 번호는 리스트 인덱스에 2를 더한 값
-                        break
-
-                if row_to_delete:
-                    worksheet.delete_rows(row_to_delete)
-                    st.success(f"✅ 설정 이름 {setting_name_to_delete}에 해당하는 프롬프트가 삭제되었습니다.")
-                else:
-                    st.error("❌ 해당 설정 이름을 찾을 수 없습니다.")
     else:
         st.warning(f"⚠️ 비밀번호: {password}에 대한 데이터를 찾을 수 없습니다.")
+
+    # 이 비밀번호로 저장한 모든 활동 유형의 설정을 한 번에 골라 삭제 (이 비밀번호로 저장한 설정만 삭제 가능)
+    owned = {}  # 선택지 이름 -> (시트 이름, 설정 이름)
+    for type_name, type_sheet in ACTIVITY_TYPES.items():
+        try:
+            records = filtered_records if type_sheet == sheet_name else lookups[type_sheet].result(timeout=call_timeout())
+        except FutureTimeoutError:
+            records = None
+        if records is None:
+            # 제한 시간 안에 불러오지 못한 활동 유형은 삭제 목록에서 뺌
+            if type_sheet != sheet_name:
+                st.warning(f"⚠️ {type_name} 활동을 불러오지 못해 삭제 목록에서 제외했습니다.")
+            continue
+        for record in records:
+            owned[f"[{type_name}] {record['setting_name']}"] = (type_sheet, record['setting_name'])
+
+    if "delete_message" in st.session_state:
+        # 삭제 후 목록을 새로 그리기 위해 다시 실행하기 전에 남긴 결과
+        st.success(st.session_state.pop("delete_message"))
+        for error in st.session_state.pop("delete_errors", []):
+            st.error(error)
+
+    if owned:
+        st.subheader("🗑️ 여러 설정 한 번에 삭제")
+        selected = st.multiselect("삭제할 설정 이름을 선택하세요 (Setting Name)", list(owned))
+
+        if selected and st.button(f"🗑️ 선택한 {len(selected)}개 삭제"):
+            # 활동 유형(워크시트)마다 한 번의 요청으로 삭제
+            codes_by_sheet = {}
+            for option in selected:
+                target_sheet, code = owned[option]
+                codes_by_sheet.setdefault(target_sheet, []).append(code)
+
+            deleted = []
+            errors = []
+            for target_sheet, codes in codes_by_sheet.items():
+                try:
+                    # 이 비밀번호로 저장한 행만 삭제 (같은 코드로 다른 교사가 저장한 행은 남김)
+                    deleted.extend(get_store().delete_many(target_sheet, codes, password_hash=hash_password(password)))
+                except Exception as e:
+                    errors.append(f"❌ 삭제 중 오류가 발생했습니다: {e}")
+            for code in deleted:
+                # 실제로 삭제했고 다른 행에도 남아 있지 않은 코드만 다시 사용할 수 있도록 색인에서 제거
+                if not get_store().code_exists(code):
+                    get_code_index().remove(code)
+
+            if deleted:
+                # 다시 실행하면 화면이 새로 그려지므로 오류도 함께 남김
+                st.session_state.delete_message = f"✅ {len(deleted)}개의 프롬프트가 삭제되었습니다."
+                st.session_state.delete_errors = errors
+                st.rerun()
+            for error in errors:
+                st.error(error)
+            if not errors:
+                st.error("❌ 해당 설정 이름을 찾을 수 없습니다.")
 else:
     st.info("비밀번호를 입력하여 데이터를 조회하세요.")
+
+# 프로파일링 결과 저장 (꺼져 있으면 아무 일도 하지 않음)
+stop_profiling(profile)
@@ -0,0 +1,120 @@
+import streamlit as st
+from utils.profiling import start_profiling, stop_profiling
+
+# 프로파일링 모드일 때 이번 실행 전체(아래의 import 포함)를 기록
+profile = start_profiling("bulk")
+
+import pandas as pd
+
+from utils.metrics import track_page
+from utils.bulk_import import COLUMNS, TEMPLATE_ROWS, read_table, normalize_columns, validate_rows, import_rows
+from utils.sheets import is_not_found
+from utils.storage import get_store
+from utils.code_index import get_code_index
+
+# 페이지 설정 - 아이콘과 제목 설정
+st.set_page_config(
+    page_title="교사용 활동 일괄 등록 도구",  # 브라우저 탭에 표시될 제목
+    page_icon="🧑‍🏫",  # 브라우저 탭에 표시될 아이콘 (이모지 또는 이미지 파일 경로)
+)
+
+# 이 페이지에서 일어나는 외부 호출 시간을 'bulk' 페이지로 기록
+track_page("bulk")
+
+# Streamlit의 배경색 변경
+background_color = "#E3F2FD"  # 연한 하늘색
+
+# Streamlit의 기본 메뉴와 푸터 숨기기
+hide_menu_style = """
+    <style>
+    #MainMenu {visibility: hidden; }
+    footer {visibility: hidden;}
+    header {visibility: hidden;}
+    </style>
+"""
+
+# 배경색 변경을 위한 CSS
+page_bg_css = f"""
+<style>
+    .stApp {{
+        background-color: {background_color};
+    }}
+</style>
+"""
+
+# Streamlit에서 HTML 및 CSS 적용
+st.markdown(hide_menu_style, unsafe_allow_html=True)
+st.markdown(page_bg_css, unsafe_allow_html=True)
+
+# 서버 데이터의 활동 코드 색인 불러오기
+with st.spinner('🔍 서버 데이터를 검색 중입니다...'):
+    try:
+        code_index = get_code_index()
+    except Exception as e:
+        # 스프레드시트나 워크시트를 찾을 수 없는 경우만 안내하고, 나머지 오류는 그대로 표시
+        if not is_not_found(e):
+            raise
+        code_index = None
+
+if code_index is None:
+    st.error('❌ 해당 폴더 내에서 서버 데이터를 찾을 수 없습니다.')
+else:
+    # 교사용 인터페이스
+    st.title("📦 교사용 활동 일괄 등록 도구")
+
+    st.markdown("""
+    **안내:** 여러 활동을 CSV 또는 엑셀(XLSX) 파일로 한 번에 등록할 수 있습니다.
+    1. **양식 내려받기**: 아래 양식 파일을 내려받아 한 줄에 활동 하나씩 입력합니다.
+    2. **열 구성**: 활동 유형(이미지 분석/텍스트 생성/이미지 생성), 활동 코드, 프롬프트(이미지 생성은 이미지 대상), 이메일(선택), 비밀번호(선택)
+    3. **검사**: 파일을 올리면 모든 행을 한 번에 검사하여 문제가 있는 행을 알려 줍니다.
+    4. **등록**: 문제가 없으면 활동 유형별로 한 번에 서버에 저장합니다.
+    """)
+
+    # 양식 파일 내려받기
+    template = pd.DataFrame(TEMPLATE_ROWS, columns=COLUMNS)
+    st.download_button(
+        "📄 양식 파일 내려받기 (CSV)",
+        template.to_csv(index=False).encode("utf-8-sig"),
+        file_name="activities_template.csv",
+        mime="text/csv"
+    )
+
+    uploaded_file = st.file_uploader("📂 CSV 또는 XLSX 파일을 올려 주세요", type=["csv", "xlsx"])
+
+    if uploaded_file is not None:
+        try:
+            table = read_table(uploaded_file)
+        except Exception as e:
+            st.error(f"❌ 파일을 읽을 수 없습니다: {e}")
+            table = None
+
+        if table is not None:
+            table, missing = normalize_columns(table)
+            if missing:
+                st.error(f"⚠️ 파일에 다음 열이 없습니다: {', '.join(missing)}")
+            elif table.empty:
+                st.warning("⚠️ 파일에 등록할 활동이 없습니다.")
+            else:
+                rows_by_sheet, errors = validate_rows(table, code_index.is_taken)
+                total = sum(len(rows) for rows in rows_by_sheet.values())
+
+                if errors:
+                    st.error(f"⚠️ {len(errors)}개 행에 문제가 있습니다. 파일을 고친 뒤 다시 올려 주세요.")
+                    st.dataframe(pd.DataFrame(errors), hide_index=True)
+                else:
+                    st.success(f"✅ 모든 행({total}개)이 유효합니다.")
+                    st.write(", ".join(f"{sheet}: {len(rows)}개" for sheet, rows in sorted(rows_by_sheet.items())))
+
+                    if st.button("💾 모든 활동을 서버에 저장"):
+                        with st.spinner('💾 데이터를 저장하는 중입니다...'):
+                            saved, failed = import_rows(rows_by_sheet, code_index, get_store())
+                        if saved:
+                            st.success(f"🎉 {sum(saved.values())}개의 활동이 저장되었습니다.")
+                        for sheet, message in failed.items():
+                            if sheet:
+                                st.error(f"❌ {sheet} 저장 중 오류가 발생했습니다: {message}")
+                            else:
+                                st.error(message)
+
+# 프로파일링 결과 저장 (꺼져 있으면 아무 일도 하지 않음)
+stop_profiling(profile)
@@ -0,0 +1 @@
+# 운영용 명령줄 도구 모음
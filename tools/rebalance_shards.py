@@ -0,0 +1,109 @@
+# 샤드(스프레드시트)를 추가한 뒤 행을 새 위치로 옮기는 도구
+# [google] shard_names 의 끝에 새 스프레드시트를 추가한 다음 실행하면,
+# 각 샤드에서 주인이 바뀐 활동(약 1/N)만 찾아 주인 샤드에 기록한 뒤 원래 샤드에서 지웁니다.
+# 중간에 멈춰도 다시 실행하면 이어서 옮깁니다. (이미 옮겨진 행은 다시 쓰지 않음)
+# 원래 샤드에서는 주인 샤드에 기록된 것을 다시 읽어 확인한 코드만 지웁니다.
+# 옮기는 동안에는 앱을 멈추고, 끝난 뒤 다시 시작하세요. (실행 중인 앱의 메모리 색인이 바뀌지 않음)
+#
+# 사용법 (저장소 최상위 폴더에서 .streamlit/secrets.toml 이 있는 상태로 실행)
+#   python -m tools.rebalance_shards --dry-run
+#   python -m tools.rebalance_shards
+import argparse
+import hashlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+from utils.config import ACTIVITY_SHEETS  # noqa: E402
+from utils.sharding import ShardRouter, get_shard_names  # noqa: E402
+from utils.storage import record_to_row, sheets_store  # noqa: E402
+
+
+def plan_moves(router, stores):
+    # (원래 샤드, 워크시트, 주인 샤드, 레코드) 목록
+    moves = []
+    for source in router.shard_names:
+        for sheet in ACTIVITY_SHEETS:
+            for record in stores[source].records(sheet):
+                owner = router.shard_for(record["setting_name"])
+                if owner != source:
+                    moves.append((source, sheet, owner, record))
+    return moves
+
+
+def _keyed(record):
+    # 저장 요청 키가 없는 예전 행은 행 내용으로 키를 만들어 다시 실행해도 중복 기록되지 않도록 함
+    # (같은 코드의 행이 여러 개여도 내용이 다르면 각각 기록됨)
+    if record["idempotency_key"]:
+        return record
+    digest = hashlib.sha1("\x1f".join(record_to_row(record)).encode("utf-8")).hexdigest()
+    return dict(record, idempotency_key=f"rebalance-{digest}")
+
+
+def apply_moves(moves, stores, log=print):
+    # 주인 샤드에 워크시트별로 한 번에 기록하고, 주인 샤드의 워크시트를 다시 읽어 기록이 확인된 코드만
+    # 원래 샤드에서 워크시트별로 한 번에 지움 (기록되지 않은 코드는 원래 샤드에 남겨 다음 실행 때 다시 옮김)
+    groups = {}
+    for source, sheet, owner, record in moves:
+        groups.setdefault((owner, sheet), []).append(record_to_row(_keyed(record)))
+
+    for (owner, sheet), rows in groups.items():
+        stores[owner].insert_many(sheet, rows)
+        log(f"{owner}/{sheet}: {len(rows)}행 기록")
+
+    written = {}
+    for owner, sheet in groups:
+        stores[owner].reload(sheet)
+        written[(owner, sheet)] = set(stores[owner].codes(sheet))
+
+    to_delete = {}
+    skipped = set()
+    for source, sheet, owner, record in moves:
+        code = record["setting_name"]
+        if code in written[(owner, sheet)]:
+            to_delete.setdefault((source, sheet), []).append(code)
+        else:
+            skipped.add(code)
+    if skipped:
+        log(f"주인 샤드에서 확인되지 않아 지우지 않은 코드: {len(skipped)}개")
+
+    deleted = 0
+    for (source, sheet), codes in to_delete.items():
+        deleted += len(stores[source].delete_many(sheet, codes))
+    log(f"원래 샤드에서 {deleted}개 코드 삭제")
+    return deleted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="샤드를 추가한 뒤 활동 기록을 주인 샤드로 옮깁니다.")
+    parser.add_argument("--dry-run", action="store_true", help="옮길 행 수만 출력")
+    args = parser.parse_args(argv)
+
+    shard_names = get_shard_names()
+    if not shard_names:
+        print("[google] shard_names 가 설정되어 있지 않습니다.")
+        return 1
+
+    router = ShardRouter(shard_names)
+    stores = {name: sheets_store(name) for name in shard_names}
+    moves = plan_moves(router, stores)
+
+    counts = {}
+    for source, sheet, owner, record in moves:
+        counts[(source, owner)] = counts.get((source, owner), 0) + 1
+    for (source, owner), count in sorted(counts.items()):
+        print(f"{source} → {owner}: {count}행")
+    print(f"옮길 행: 모두 {len(moves)}행")
+
+    if moves and not args.dry_run:
+        apply_moves(moves, stores)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
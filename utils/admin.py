@@ -0,0 +1,82 @@
+# 숨겨진 관리자 화면
+# Home.py?admin=<토큰> 으로 접속하면 외부 호출 시간, OpenAI 키 사용 현황, 저장 대기열 상태를 보여 줍니다.
+# 토큰은 .streamlit/secrets.toml 의 [metrics] admin_token 으로 설정합니다. (설정하지 않으면 화면이 열리지 않음)
+import streamlit as st
+
+from utils.config import get_setting
+from utils.metrics import registry
+
+
+def is_admin_request():
+    token = get_setting("metrics", "admin_token")
+    return bool(token) and st.query_params.get("admin") == token
+
+
+def render_admin_page():
+    st.title("🛠️ 관리자 화면")
+
+    st.subheader("⏱️ 외부 호출 시간 (호출별/페이지별/워크시트별)")
+    summary = registry.summary()
+    if summary:
+        st.dataframe(summary)
+    else:
+        st.info("아직 기록된 외부 호출이 없습니다.")
+
+    st.subheader("🧾 최근 호출")
+    st.dataframe(registry.recent())
+
+    st.subheader("🔑 OpenAI 키 사용 현황")
+    try:
+        from utils.clients import get_openai_pool
+        st.dataframe(get_openai_pool().stats())
+    except Exception as e:
+        st.warning(f"OpenAI 키 정보를 불러올 수 없습니다: {e}")
+
+    st.subheader("📨 저장 대기열")
+    try:
+        from utils.save_queue import get_save_queue
+        st.write(f"서버에 반영을 기다리는 저장 요청: {len(get_save_queue().pending_rows())}건")
+        failed = get_save_queue().failed_entries()
+        if failed:
+            st.error(f"기록하지 못한 저장 요청: {len(failed)}건 (save_failed.jsonl)")
+            st.dataframe([{"시트": entry["sheet"], "활동 코드": entry["row"][1], "오류": entry["error"]} for entry in failed])
+    except Exception as e:
+        st.warning(f"저장 대기열 정보를 불러올 수 없습니다: {e}")
+
+    st.subheader("🗄️ 오래된 활동 보관")
+    render_archive_section()
+
+    st.subheader("📈 Prometheus")
+    st.code(registry.render_prometheus(), language="text")
+
+
+def render_archive_section():
+    from utils.archive import get_archiver, restore
+    from utils.storage import get_store
+
+    archiver = get_archiver()
+    if archiver is None:
+        st.info("[archive] max_age_days 가 설정되어 있지 않아 정리 작업을 하지 않습니다.")
+    else:
+        st.write(f"보관 기준: {archiver.max_age_days:g}일, 마지막 정리: {archiver.last_run or '아직 없음'}")
+        if archiver.last_result:
+            st.write(", ".join(f"{sheet}: {count}행" for sheet, count in archiver.last_result.items()))
+        if archiver.last_error:
+            st.error(f"마지막 정리 작업 오류: {archiver.last_error}")
+        if st.button("🧹 지금 정리하기"):
+            with st.spinner("오래된 활동을 보관하는 중입니다..."):
+                try:
+                    result = archiver.run_once()
+                    st.success(f"✅ {sum(result.values())}개의 활동을 보관했습니다.")
+                except Exception as e:
+                    st.error(f"❌ 정리 작업 중 오류가 발생했습니다: {e}")
+
+    code = st.text_input("복원할 활동 코드").strip()
+    if code and st.button("♻️ 보관된 활동 복원"):
+        try:
+            if restore(get_store(), code):
+                st.success(f"✅ {code} 활동을 복원했습니다.")
+            else:
+                st.error("❌ 보관된 활동에서 해당 코드를 찾을 수 없습니다.")
+        except Exception as e:
+            st.error(f"❌ 복원 중 오류가 발생했습니다: {e}")
@@ -0,0 +1,153 @@
+# 오래된 활동 기록을 보관용 워크시트로 옮기는 정리 작업
+# A열의 저장 시각이 설정한 기간보다 오래된 행을 "시트1_보관" 같은 워크시트로 옮기고,
+# 원래 워크시트에서는 행을 지워(빈 행도 함께) 자주 읽는 워크시트를 작게 유지합니다.
+# 옮길 때는 보관용 워크시트에 기록된 것을 확인한 활동만 원래 워크시트에서 지웁니다. (utils.storage 의 move)
+# 보관된 활동 코드는 계속 사용 중으로 처리되며, 관리자 화면에서 다시 복원할 수 있습니다.
+#
+# .streamlit/secrets.toml 설정 예시 (max_age_days 가 없으면 정리 작업을 하지 않음)
+#   [archive]
+#   max_age_days = 365    # 이 기간보다 오래된 활동을 보관
+#   interval_hours = 24   # 정리 작업 주기
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from utils.config import ACTIVITY_SHEETS, get_setting
+from utils.sheets import is_not_found
+from utils.storage import get_store, record_to_row
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = "_보관"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_INTERVAL_HOURS = 24
+# 서버가 시작된 뒤 첫 정리 작업까지 기다리는 시간(초)
+FIRST_RUN_DELAY = 5 * 60
+
+
+def archive_sheet(sheet):
+    return f"{sheet}{ARCHIVE_SUFFIX}"
+
+
+def is_enabled():
+    return get_setting("archive", "max_age_days") is not None
+
+
+def _is_older(timestamp, cutoff):
+    try:
+        return datetime.strptime(timestamp, TIMESTAMP_FORMAT) < cutoff
+    except (TypeError, ValueError):
+        # 형식이 다른 시각은 옮기지 않음
+        return False
+
+
+def _archived(record):
+    # 저장 요청 키가 없는 예전 행은 행 내용으로 키를 만들어, 정리 작업이 중간에 멈춘 뒤 다시 실행해도 한 번만 기록
+    # (같은 코드의 행이 여러 개여도 내용이 다르면 각각 기록됨)
+    if record["idempotency_key"]:
+        return record
+    digest = hashlib.sha1("\x1f".join(record_to_row(record)).encode("utf-8")).hexdigest()
+    return dict(record, idempotency_key=f"archive-{digest}")
+
+
+def compact(store, max_age_days, now=None):
+    # 오래된 행을 보관용 워크시트로 옮기고, 옮긴 행 수를 시트별로 돌려줌
+    # 활동 코드 단위로 옮기므로, 같은 코드의 행 중 하나라도 최근 것이면 그 코드는 옮기지 않음
+    cutoff = (now or datetime.now()) - timedelta(days=max_age_days)
+    moved = {}
+    for sheet in ACTIVITY_SHEETS:
+        target = archive_sheet(sheet)
+        store.ensure_sheet(target)
+        records = store.records(sheet)
+        recent = {record["setting_name"] for record in records if not _is_older(record["timestamp"], cutoff)}
+        stale = [record for record in records if record["setting_name"] not in recent]
+        moved_codes = set(store.move(sheet, target, [_archived(record) for record in stale], drop_blank=True))
+        moved[sheet] = len([record for record in stale if record["setting_name"] in moved_codes])
+    return moved
+
+
+def archived_codes(store):
+    # 보관용 워크시트의 활동 코드 (워크시트가 아직 없으면 건너뜀)
+    codes = []
+    for sheet in ACTIVITY_SHEETS:
+        try:
+            codes.extend(store.codes(archive_sheet(sheet)))
+        except Exception as e:
+            if not is_not_found(e):
+                raise
+    return codes
+
+
+def find_archived(store, code):
+    # 보관된 활동을 찾아 (원래 워크시트, 그 코드의 레코드 목록) 을 돌려줌, 없으면 None
+    for sheet in ACTIVITY_SHEETS:
+        try:
+            records = store.records(archive_sheet(sheet))
+        except Exception as e:
+            if not is_not_found(e):
+                raise
+            continue
+        found = [record for record in records if record["setting_name"] == code]
+        if found:
+            return sheet, found
+    return None
+
+
+def restore(store, code):
+    # 보관된 활동을 원래 워크시트로 되돌림, 찾지 못했거나 옮기지 못하면 False
+    found = find_archived(store, code)
+    if found is None:
+        return False
+    sheet, records = found
+    return code in store.move(archive_sheet(sheet), sheet, records)
+
+
+class Archiver:
+    # 정해진 주기마다 compact 를 실행하는 백그라운드 작업
+    def __init__(self, store, max_age_days, interval, first_run_delay=FIRST_RUN_DELAY):
+        self.store = store
+        self.max_age_days = max_age_days
+        self.interval = interval
+        self.last_run = None
+        self.last_result = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._first_run_delay = first_run_delay
+        threading.Thread(target=self._run, name="archive-compactor", daemon=True).start()
+
+    def _run(self):
+        time.sleep(self._first_run_delay)
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("오래된 활동 정리 작업에 실패했습니다.")
+            time.sleep(self.interval)
+
+    def run_once(self):
+        with self._lock:
+            try:
+                self.last_result = compact(self.store, self.max_age_days)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            finally:
+                self.last_run = datetime.now().strftime(TIMESTAMP_FORMAT)
+            return self.last_result
+
+
+@st.cache_resource(show_spinner=False)
+def get_archiver():
+    # [archive] max_age_days 가 없으면 None
+    if not is_enabled():
+        return None
+    return Archiver(
+        get_store(),
+        float(get_setting("archive", "max_age_days")),
+        float(get_setting("archive", "interval_hours", DEFAULT_INTERVAL_HOURS)) * 60 * 60
+    )
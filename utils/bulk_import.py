@@ -0,0 +1,128 @@
+# CSV/XLSX 파일로 여러 활동을 한 번에 등록
+# 모든 행을 한 번에 검사한 뒤(활동 유형, 활동 코드 중복, 숫자만 입력 금지 규칙 등),
+# 활동 유형(시트1~3)마다 한 번의 일괄 저장(insert_many)으로 기록합니다.
+import uuid
+from datetime import datetime
+
+# 파일의 열 이름 (영문 또는 한글 머리글 모두 허용)
+COLUMNS = ["type", "code", "prompt", "email", "password"]
+COLUMN_ALIASES = {
+    "type": "type", "활동 유형": "type", "유형": "type",
+    "code": "code", "활동 코드": "code", "코드": "code",
+    "prompt": "prompt", "프롬프트": "prompt", "이미지 대상": "prompt", "subject": "prompt",
+    "email": "email", "이메일": "email",
+    "password": "password", "비밀번호": "password",
+}
+
+# 활동 유형 → 저장할 시트
+TYPE_SHEETS = {
+    "이미지 분석": "시트1", "vision": "시트1", "시트1": "시트1",
+    "텍스트 생성": "시트2", "text": "시트2", "시트2": "시트2",
+    "이미지 생성": "시트3", "image": "시트3", "시트3": "시트3",
+}
+
+# 양식 파일 예시
+TEMPLATE_ROWS = [
+    ["이미지 분석", "vision01", "사진 속 식물의 특징을 설명해 주세요.", "", "teacher1"],
+    ["텍스트 생성", "story01", "학생이 쓴 글의 좋은 점을 칭찬해 주세요.", "", "teacher1"],
+    ["이미지 생성", "bear01", "곰", "", "teacher1"],
+]
+
+
+def read_table(uploaded_file):
+    # 업로드한 파일을 모든 값이 문자열인 DataFrame 으로 읽음
+    import pandas as pd
+
+    if uploaded_file.name.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(uploaded_file, dtype=str, keep_default_na=False)
+    try:
+        return pd.read_csv(uploaded_file, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        # 엑셀에서 저장한 한글 CSV (CP949)
+        uploaded_file.seek(0)
+        return pd.read_csv(uploaded_file, dtype=str, keep_default_na=False, encoding="cp949")
+
+
+def normalize_columns(table):
+    # 머리글을 COLUMNS 이름으로 바꾸고, 빠진 열 목록을 돌려줌
+    renamed = {}
+    for column in table.columns:
+        key = str(column).strip()
+        renamed[column] = COLUMN_ALIASES.get(key.lower(), COLUMN_ALIASES.get(key, key))
+    table = table.rename(columns=renamed)
+    missing = [column for column in COLUMNS if column not in table.columns]
+    return table, missing
+
+
+def validate_rows(table, is_taken):
+    # 모든 행을 검사하여 (시트별 저장할 행, 오류 목록) 을 돌려줌
+    # 저장할 행은 [시간, 활동 코드, 프롬프트, 이메일, 비밀번호, 저장 요청 키] 형식
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows_by_sheet = {}
+    errors = []
+    seen = {}
+
+    for i, record in enumerate(table[COLUMNS].itertuples(index=False)):
+        line = i + 2  # 머리글이 1행
+        activity_type, code, prompt, email, password = (str(value).strip() for value in record)
+
+        def error(message):
+            errors.append({"행": line, "활동 코드": code, "오류": message})
+
+        sheet = TYPE_SHEETS.get(activity_type) or TYPE_SHEETS.get(activity_type.lower())
+        if sheet is None:
+            error(f"⚠️ 알 수 없는 활동 유형입니다: '{activity_type}' (이미지 분석, 텍스트 생성, 이미지 생성 중 하나)")
+            continue
+        if not code:
+            error("⚠️ 활동 코드를 입력하세요.")
+            continue
+        if code.isdigit():
+            error("⚠️ 활동 코드는 숫자만으로 구성될 수 없습니다. 문자 또는 문자+숫자 조합을 사용하세요.")
+            continue
+        if code in seen:
+            error(f"⚠️ 파일 안에서 같은 코드가 {seen[code]}행에도 있습니다.")
+            continue
+        seen[code] = line
+        if is_taken(code):
+            error("⚠️ 이미 사용된 코드입니다. 다른 코드를 입력해주세요.")
+            continue
+        if not prompt:
+            error("⚠️ 프롬프트(이미지 생성은 이미지 대상)를 입력하세요.")
+            continue
+        if password and password.isnumeric():
+            error("⚠️ 비밀번호는 숫자만 입력할 수 없습니다. 영문 또는 영문+숫자 조합을 사용하세요.")
+            continue
+
+        rows_by_sheet.setdefault(sheet, []).append([current_time, code, prompt, email, password, uuid.uuid4().hex])
+
+    return rows_by_sheet, errors
+
+
+def import_rows(rows_by_sheet, code_index, store):
+    # 모든 코드를 먼저 예약한 뒤 시트마다 한 번에 저장
+    # 돌려주는 값: (시트별 저장한 행 수, 시트별 오류 메시지)
+    reservations = {}
+    for rows in rows_by_sheet.values():
+        for row in rows:
+            token = code_index.reserve(row[1])
+            if token is None:
+                # 검사 이후 다른 교사가 같은 코드를 저장함
+                for reserved in reservations.values():
+                    code_index.release(reserved)
+                return {}, {"": f"⚠️ 이미 사용된 코드입니다: {row[1]}"}
+            reservations[row[1]] = token
+
+    saved = {}
+    failed = {}
+    for sheet, rows in rows_by_sheet.items():
+        try:
+            store.insert_many(sheet, rows)
+        except Exception as e:
+            failed[sheet] = str(e)
+            for row in rows:
+                code_index.release(reservations[row[1]])
+            continue
+        saved[sheet] = len(rows)
+        for row in rows:
+            code_index.commit(reservations[row[1]])
+    return saved, failed
@@ -0,0 +1,170 @@
+# 모든 페이지가 공유하는 Google/OpenAI 클라이언트
+# Streamlit은 클릭이나 입력이 있을 때마다 스크립트 전체를 다시 실행하므로,
+# 인증과 클라이언트 생성은 st.cache_resource 로 서버 프로세스당 한 번만 수행하고
+# 모든 세션이 같은 클라이언트를 재사용합니다.
+# gspread, oauth2client, googleapiclient, openai 는 불러오는 데만 수백 ms 가 걸리므로
+# 모듈 맨 위가 아니라 실제로 클라이언트를 처음 만들 때 불러옵니다.
+# (예: 이미지 생성/조회 페이지는 openai 를 전혀 불러오지 않음)
+import importlib
+import json
+import threading
+import time
+
+import streamlit as st
+
+from utils.metrics import registry, span
+from utils.rate_limit import throttle
+
+# Google Sheets 및 Google Drive API 권한 범위
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+    "https://www.googleapis.com/auth/spreadsheets"
+]
+
+# 액세스 토큰(유효시간 1시간)을 만료 전에 미리 갱신하는 주기(초)
+TOKEN_REFRESH_INTERVAL = 30 * 60
+
+# 백그라운드에서 토큰을 갱신할 함수 목록
+_refresh_targets = []
+_refresh_lock = threading.Lock()
+_refresher_started = False
+
+# 스레드별 Drive HTTP 연결 (httplib2 연결은 스레드 간에 공유할 수 없음)
+_thread_local = threading.local()
+
+# 홈 화면이 열릴 때 백그라운드에서 미리 불러 둘 모듈
+WARM_UP_MODULES = [
+    "gspread",
+    "httplib2",
+    "oauth2client.service_account",
+    "googleapiclient.discovery",
+    "openai",
+]
+_warm_up_started = False
+
+
+def _refresh_loop():
+    while True:
+        time.sleep(TOKEN_REFRESH_INTERVAL)
+        with _refresh_lock:
+            targets = list(_refresh_targets)
+        for refresh in targets:
+            try:
+                refresh()
+            except Exception:
+                # 갱신에 실패해도 다음 요청 시 라이브러리가 다시 갱신을 시도하므로 무시
+                pass
+
+
+def _register_for_refresh(refresh):
+    global _refresher_started
+    with _refresh_lock:
+        _refresh_targets.append(refresh)
+        if not _refresher_started:
+            threading.Thread(target=_refresh_loop, name="token-refresher", daemon=True).start()
+            _refresher_started = True
+
+
+def _gspread_auth(gc):
+    # gspread 6 은 http_client.auth, gspread 5 는 auth 에 자격 증명을 보관
+    http_client = getattr(gc, "http_client", None)
+    return getattr(http_client, "auth", None) or getattr(gc, "auth", None)
+
+
+@st.cache_resource(show_spinner=False)
+def get_credentials():
+    # Google Sheets 및 Google Drive API 인증 설정
+    import httplib2
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    credentials_dict = json.loads(st.secrets["gcp"]["credentials"])
+    credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_dict, SCOPES)
+    _register_for_refresh(lambda: credentials.refresh(httplib2.Http()))
+    return credentials
+
+
+@st.cache_resource(show_spinner=False)
+def get_gspread_client():
+    import gspread
+
+    gc = gspread.authorize(get_credentials())
+
+    auth = _gspread_auth(gc)
+    if auth is not None and hasattr(auth, "refresh"):
+        from google.auth.transport.requests import Request
+        _register_for_refresh(lambda: auth.refresh(Request()))
+    return gc
+
+
+@st.cache_resource(show_spinner=False)
+def get_drive_service():
+    # Google Drive API 클라이언트 생성
+    # discovery 문서를 읽고 파싱하지 않도록 필요한 부분만 담아 둔 문서로 만듦
+    from googleapiclient.discovery import build_from_document
+    from utils.drive_discovery import DRIVE_V3_DISCOVERY
+
+    return build_from_document(DRIVE_V3_DISCOVERY, credentials=get_credentials())
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_pool():
+    # 설정된 모든 API 키에 요청을 나누어 보냄 (키별 사용 현황은 get_openai_pool().stats())
+    from utils.openai_pool import OpenAIKeyPool
+
+    pool = OpenAIKeyPool(list(st.secrets["api"]["keys"]))
+    registry.add_collector(lambda: _openai_key_metrics(pool))
+    return pool
+
+
+def _openai_key_metrics(pool):
+    # Prometheus 출력에 키별 사용 현황 추가
+    lines = []
+    for stat in pool.stats():
+        labels = f'key="{stat["key"]}"'
+        lines.append(f"aitoolmaker_openai_key_in_flight{{{labels}}} {stat['in_flight']}")
+        lines.append(f"aitoolmaker_openai_key_requests_total{{{labels}}} {stat['requests']}")
+        lines.append(f"aitoolmaker_openai_key_failures_total{{{labels}}} {stat['failures']}")
+        lines.append(f"aitoolmaker_openai_key_rate_limited_total{{{labels}}} {stat['rate_limited']}")
+        lines.append(f"aitoolmaker_openai_key_cooldown_seconds{{{labels}}} {stat['cooldown_remaining']}")
+    return lines
+
+
+def get_openai_client():
+    # OpenAI 클라이언트와 같은 방식으로 사용할 수 있는 풀 클라이언트 (요청마다 속도 제한과 시간 측정 적용)
+    from utils.openai_pool import PooledClient
+
+    return PooledClient(
+        get_openai_pool(),
+        before_call=lambda: throttle("openai"),
+        instrument=lambda: span("openai.chat.completions.create")
+    )
+
+
+def execute_drive(request):
+    # Drive 요청은 스레드별 HTTP 연결로 실행 (세션마다 별도 스레드에서 스크립트가 실행됨)
+    http = getattr(_thread_local, "drive_http", None)
+    if http is None:
+        import httplib2
+
+        http = get_credentials().authorize(httplib2.Http())
+        _thread_local.drive_http = http
+    return request.execute(http=http)
+
+
+def _warm_up():
+    for name in WARM_UP_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+
+
+def warm_up_in_background():
+    # 첫 페이지를 열기 전에 무거운 모듈을 미리 불러 둠 (프로세스당 한 번)
+    global _warm_up_started
+    with _refresh_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=_warm_up, name="import-warm-up", daemon=True).start()
@@ -0,0 +1,98 @@
+# 모든 활동 유형(시트1~3)의 활동 코드를 한 곳에서 관리하는 색인
+# 처음 한 번만 저장소에서 코드를 읽어 오고, 이후 중복 확인은 메모리에서 바로 처리합니다.
+# 저장소의 동기화 주기마다 다른 서버나 사람이 새로 추가한 코드도 가져옵니다.
+# 저장할 때는 코드를 먼저 예약(reserve)한 뒤 저장이 끝나면 확정(commit)하므로,
+# 두 교사가 동시에 같은 코드로 저장해도 한 명만 성공합니다.
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from utils.archive import archived_codes, get_archiver, is_enabled
+from utils.storage import get_store
+from utils.save_queue import get_save_queue
+
+# 확정되지 않은 예약이 자동으로 풀리는 시간(초) - 저장 도중 세션이 끊긴 경우 대비
+RESERVATION_TTL = 120
+
+
+class ActivityCodeIndex:
+    def __init__(self, reservation_ttl=RESERVATION_TTL, sync=None):
+        self._lock = threading.Lock()
+        self._sync = sync  # 새로 추가된 코드를 돌려주는 함수 (예: store.sync)
+        self._reservation_ttl = reservation_ttl
+        self._codes = set()
+        self._reserved = {}  # 예약 토큰 -> (활동 코드, 만료 시각)
+        self._reserved_codes = set()
+
+    def _expire(self):
+        now = time.time()
+        for token, (code, expires_at) in list(self._reserved.items()):
+            if expires_at < now:
+                del self._reserved[token]
+                self._reserved_codes.discard(code)
+
+    def load(self, codes):
+        with self._lock:
+            self._codes.update(codes)
+
+    def _pull(self):
+        if self._sync is not None:
+            self.load(self._sync())
+
+    def is_taken(self, code):
+        # 이미 저장되었거나 다른 세션이 저장 중인 코드인지 확인
+        self._pull()
+        with self._lock:
+            self._expire()
+            return code in self._codes or code in self._reserved_codes
+
+    def reserve(self, code):
+        # 코드가 비어 있으면 예약 토큰을, 이미 사용 중이면 None 을 돌려줌
+        self._pull()
+        with self._lock:
+            self._expire()
+            if code in self._codes or code in self._reserved_codes:
+                return None
+            token = uuid.uuid4().hex
+            self._reserved[token] = (code, time.time() + self._reservation_ttl)
+            self._reserved_codes.add(code)
+            return token
+
+    def commit(self, token):
+        # 저장이 끝난 예약을 확정된 코드로 옮김
+        with self._lock:
+            entry = self._reserved.pop(token, None)
+            if entry:
+                self._reserved_codes.discard(entry[0])
+                self._codes.add(entry[0])
+
+    def release(self, token):
+        # 저장에 실패한 예약을 취소
+        with self._lock:
+            entry = self._reserved.pop(token, None)
+            if entry:
+                self._reserved_codes.discard(entry[0])
+
+    def add(self, code):
+        with self._lock:
+            self._codes.add(code)
+
+    def remove(self, code):
+        with self._lock:
+            self._codes.discard(code)
+
+
+@st.cache_resource(show_spinner=False)
+def get_code_index():
+    # 서버 프로세스당 한 번만 저장소에서 모든 활동 유형의 활동 코드를 읽어 옴
+    index = ActivityCodeIndex(sync=get_store().sync)
+    index.load(get_store().all_codes())
+    if is_enabled():
+        # 보관된 활동의 코드도 계속 사용 중으로 처리하고, 정리 작업을 시작
+        index.load(archived_codes(get_store()))
+        get_archiver()
+    # 저장 대기열에 남아 있는 (아직 시트에 기록되지 않은) 코드도 사용 중으로 처리
+    index.load(row[1] for row in get_save_queue().pending_rows())
+    return index
@@ -0,0 +1,31 @@
+# 여러 모듈에서 함께 쓰는 설정 값
+import os
+
+import streamlit as st
+
+# 서버 데이터(스프레드시트)가 들어 있는 Google Drive 폴더 ID
+FOLDER_ID = "1xJHiTJWXkeIhEOFBX2WyCb4fTQtGOIY-"
+
+# 활동 유형별 워크시트 이름 (이미지 분석, 텍스트 생성, 이미지 생성)
+ACTIVITY_SHEETS = ["시트1", "시트2", "시트3"]
+
+# 로컬 캐시 파일을 보관하는 디렉터리 (환경 변수로 변경 가능)
+DATA_DIR = os.environ.get(
+    "AITOOLMAKER_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".data")
+)
+
+
+def get_setting(section, key, default=None):
+    # st.secrets 의 [section] key 값을 읽고, 없으면 기본값을 돌려줌
+    try:
+        return st.secrets[section][key]
+    except Exception:
+        return default
+
+
+def data_path(*parts):
+    # DATA_DIR 아래의 파일 경로 (디렉터리가 없으면 생성)
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,57 @@
+# Google Drive API v3 discovery 문서 중 이 앱이 사용하는 부분 (files.list)
+# build('drive', 'v3') 는 200KB 가 넘는 discovery 문서를 읽고 파싱하므로,
+# 필요한 부분만 파이썬 dict 로 담아 두고 build_from_document 로 클라이언트를 만듭니다.
+# 다른 Drive 메서드가 필요해지면 googleapiclient/discovery_cache/documents/drive.v3.json 에서 옮겨 오세요.
+
+_QUERY_STRING = {"location": "query", "type": "string"}
+_QUERY_BOOLEAN = {"location": "query", "type": "boolean"}
+
+DRIVE_V3_DISCOVERY = {
+    "kind": "discovery#restDescription",
+    "discoveryVersion": "v1",
+    "id": "drive:v3",
+    "name": "drive",
+    "version": "v3",
+    "rootUrl": "https://www.googleapis.com/",
+    "servicePath": "drive/v3/",
+    "basePath": "/drive/v3/",
+    "baseUrl": "https://www.googleapis.com/drive/v3/",
+    "batchPath": "batch/drive/v3",
+    "protocol": "rest",
+    "parameters": {
+        "alt": {"location": "query", "type": "string", "default": "json", "enum": ["json", "media", "proto"]},
+        "fields": _QUERY_STRING,
+        "key": _QUERY_STRING,
+        "prettyPrint": {"location": "query", "type": "boolean", "default": "true"},
+        "quotaUser": _QUERY_STRING,
+    },
+    "schemas": {
+        "FileList": {"id": "FileList", "type": "object"},
+    },
+    "resources": {
+        "files": {
+            "methods": {
+                "list": {
+                    "id": "drive.files.list",
+                    "path": "files",
+                    "flatPath": "files",
+                    "httpMethod": "GET",
+                    "parameterOrder": [],
+                    "parameters": {
+                        "corpora": _QUERY_STRING,
+                        "driveId": _QUERY_STRING,
+                        "includeItemsFromAllDrives": _QUERY_BOOLEAN,
+                        "orderBy": _QUERY_STRING,
+                        "pageSize": {"location": "query", "type": "integer", "format": "int32"},
+                        "pageToken": _QUERY_STRING,
+                        "q": _QUERY_STRING,
+                        "spaces": _QUERY_STRING,
+                        "supportsAllDrives": _QUERY_BOOLEAN,
+                    },
+                    "response": {"$ref": "FileList"},
+                    "scopes": ["https://www.googleapis.com/auth/drive"],
+                },
+            },
+        },
+    },
+}
@@ -0,0 +1,64 @@
+# 외부 호출(gspread/Drive/OpenAI)을 동시에 실행하는 공용 스레드 풀
+# 서로 관계없는 호출(예: 시트1~3 읽기, 샤드별 조회)을 동시에 보내 전체 대기 시간이
+# 호출 시간의 합이 아니라 가장 느린 호출 하나의 시간에 가깝도록 합니다.
+# 스레드 수에 상한이 있으므로 세션이 많아도 외부 호출용 스레드가 무한히 늘지 않습니다.
+#
+# .streamlit/secrets.toml 설정 예시
+#   [executor]
+#   max_workers = 8   # 동시에 실행하는 최대 호출 수 (프로세스 전체)
+#   timeout = 30      # 호출 하나의 결과를 기다리는 최대 시간(초)
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.config import get_setting
+from utils.metrics import bind_session, caller_script_run_ctx, current_session_id
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 30
+
+# 풀의 작업 스레드에서 실행 중인지 표시
+# 작업 안에서 다시 풀에 작업을 넣고 기다리면 스레드가 모자라 멈출 수 있으므로, 그때는 바로 실행함
+_in_worker = threading.local()
+
+
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    max_workers = int(get_setting("executor", "max_workers", DEFAULT_MAX_WORKERS))
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="remote-call")
+
+
+def call_timeout():
+    return float(get_setting("executor", "timeout", DEFAULT_TIMEOUT))
+
+
+def _run_in_worker(context, fn, args, kwargs):
+    # 호출한 쪽의 contextvars(예: 메트릭의 현재 페이지, 요청한 세션 ID)를 이어받아 실행
+    # (Streamlit 실행 정보는 스레드에 붙이지 않고 넘겨만 두어, 속도 제한 대기 안내를 그릴 때만 사용)
+    _in_worker.active = True
+    try:
+        return context.run(fn, *args, **kwargs)
+    finally:
+        _in_worker.active = False
+
+
+def submit(fn, *args, **kwargs):
+    # fn(*args, **kwargs) 를 풀에서 실행하고 Future 를 돌려줌
+    # 요청한 세션 ID 와 페이지 실행 정보를 함께 넘겨, 속도 제한(utils.rate_limit)이 작업을 그 세션의 차례로 처리하고
+    # 기다리는 동안 대기 순서를 그 페이지에 표시하도록 함
+    context = contextvars.copy_context()
+    context.run(bind_session, current_session_id(), caller_script_run_ctx())
+    return get_executor().submit(_run_in_worker, context, fn, args, kwargs)
+
+
+def run_all(fn, items, timeout=None):
+    # items 의 각 값으로 fn 을 동시에 호출하고 결과를 같은 순서의 목록으로 돌려줌
+    # 호출 하나가 timeout 초 안에 끝나지 않으면 concurrent.futures.TimeoutError, 실패하면 그 예외를 그대로 발생
+    items = list(items)
+    if len(items) <= 1 or getattr(_in_worker, "active", False):
+        return [fn(item) for item in items]
+    timeout = timeout if timeout is not None else call_timeout()
+    futures = [submit(fn, item) for item in items]
+    return [future.result(timeout=timeout) for future in futures]
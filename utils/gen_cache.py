@@ -0,0 +1,147 @@
+# 인공지능 프롬프트 생성 결과 캐시
+# 같은 도구/주제/모델/시스템 프롬프트 버전의 요청은 저장된 결과를 재사용하고,
+# 같은 요청이 동시에 들어오면 먼저 시작한 요청의 결과를 함께 기다려 API 를 한 번만 호출합니다.
+#
+# .streamlit/secrets.toml 설정 예시
+#   [generation]
+#   cache_size = 500        # 보관할 최대 결과 수 (오래 사용하지 않은 것부터 삭제)
+#   cache_ttl = 86400       # 결과 유효시간(초)
+#   cache_persist = true    # 서버를 다시 시작해도 유지되도록 디스크에 저장
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import streamlit as st
+
+from utils.config import get_setting, data_path
+
+
+class GenerationAbandoned(Exception):
+    # 먼저 시작한 요청이 결과 없이 끝난 경우 (중지, 빈 응답 등)
+    pass
+
+
+def normalize_topic(topic):
+    # 대소문자, 공백, 유니코드 조합 방식 차이를 무시
+    return " ".join(unicodedata.normalize("NFC", topic).split()).lower()
+
+
+def make_key(tool, topic, model, version):
+    return "\x1f".join([tool, normalize_topic(topic), model, str(version)])
+
+
+class GenerationCache:
+    def __init__(self, max_entries=500, ttl=24 * 60 * 60, path=None):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._path = path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # 키 -> (결과, 저장 시각)
+        self._in_flight = {}  # 키 -> Future
+        self._load()
+
+    def _load(self):
+        if not self._path:
+            return
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                for key, value, stored_at in json.load(f):
+                    self._entries[key] = (value, stored_at)
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        if not self._path:
+            return
+        tmp_path = f"{self._path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([[key, value, stored_at] for key, (value, stored_at) in self._entries.items()], f, ensure_ascii=False)
+        os.replace(tmp_path, self._path)
+
+    def lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def claim(self, key):
+        # (먼저 시작한 요청인지, Future) 를 돌려줌
+        # 먼저 시작한 요청은 결과를 만든 뒤 complete/abandon 을 호출하고,
+        # 나머지는 Future.result() 로 그 결과를 기다림
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return False, future
+            future = Future()
+            self._in_flight[key] = future
+            return True, future
+
+    def complete(self, key, future, value):
+        self.put(key, value)
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        future.set_result(value)
+
+    def abandon(self, key, future, error=None):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        future.set_exception(error or GenerationAbandoned())
+
+    def get_or_compute(self, key, compute, refresh=False):
+        # refresh=True 이면 저장된 결과와 진행 중인 요청을 무시하고 새로 만듦
+        if refresh:
+            value = compute()
+            if value:
+                self.put(key, value)
+            return value
+
+        value = self.lookup(key)
+        if value is not None:
+            return value
+
+        leader, future = self.claim(key)
+        if not leader:
+            try:
+                return future.result()
+            except GenerationAbandoned:
+                return compute()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            self.abandon(key, future, e if isinstance(e, Exception) else None)
+            raise
+        if value:
+            self.complete(key, future, value)
+        else:
+            self.abandon(key, future)
+        return value
+
+
+@st.cache_resource(show_spinner=False)
+def get_generation_cache():
+    path = data_path("generation_cache.json") if get_setting("generation", "cache_persist", False) else None
+    return GenerationCache(
+        max_entries=int(get_setting("generation", "cache_size", 500)),
+        ttl=float(get_setting("generation", "cache_ttl", 24 * 60 * 60)),
+        path=path
+    )
@@ -0,0 +1,108 @@
+# 인공지능 도움 받기 - 프롬프트 생성
+# 생성 결과는 utils.gen_cache 에 보관되어 같은 주제의 요청은 API 를 다시 호출하지 않습니다.
+import contextlib
+
+from utils.gen_cache import GenerationAbandoned, get_generation_cache, make_key
+
+# 프롬프트 생성에 사용하는 GPT 모델
+MODEL = "gpt-4o-mini"
+
+# 여러 후보 받기에서 한 번의 요청으로 받는 프롬프트 수
+CANDIDATE_COUNT = 3
+
+# 아래 시스템 프롬프트나 요청 문구를 바꾸면 이 값을 올려서 이전 캐시 결과를 사용하지 않도록 함
+SYSTEM_PROMPT_VERSION = 1
+
+# 도구별 시스템 프롬프트와 사용자 요청 문구
+SYSTEM_PROMPTS = {
+    "vision": "당신은 Vision API를 사용하여 교육 목적으로 시스템 프롬프트를 만드는 것을 돕는 AI입니다. 이미지의 시각적 요소를 분석하여 이에 기반한 프롬프트를 생성하세요.",
+    "text": "당신은 text generation api를 이용하여 교육 목적으로 시스템 프롬프트를 만드는 것을 돕는 AI입니다.",
+}
+USER_PROMPTS = {
+    "vision": "프롬프트의 주제는: {topic}입니다. 이 주제를 바탕으로 Vision API를 사용하여 창의적이고 교육적인 시스템 프롬프트를 생성해 주세요.",
+    "text": "프롬프트의 주제는: {topic}입니다. 이 주제를 바탕으로 Text Generation API를 사용하여 창의적이고 교육적인 시스템 프롬프트를 생성해 주세요.",
+}
+
+
+def build_messages(tool, topic):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPTS[tool]},
+        {"role": "user", "content": USER_PROMPTS[tool].format(topic=topic)}
+    ]
+
+
+def _create_completion(client, tool, topic):
+    response = client.chat.completions.create(model=MODEL, messages=build_messages(tool, topic))
+    if response.choices and response.choices[0].message.content:
+        return response.choices[0].message.content.strip()
+    return ""
+
+
+def _create_candidates(client, tool, topic, n):
+    # n 파라미터로 한 번의 요청에서 여러 응답(choices)을 받음
+    response = client.chat.completions.create(model=MODEL, messages=build_messages(tool, topic), n=n)
+    return [choice.message.content.strip() for choice in response.choices if (choice.message.content or "").strip()]
+
+
+def _stream_completion(client, tool, topic):
+    stream = client.chat.completions.create(model=MODEL, messages=build_messages(tool, topic), stream=True)
+    with contextlib.closing(stream):
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+def generate_prompt(client, tool, topic, refresh=False):
+    # 응답 전체를 한 번에 받아 돌려줌 (실패하면 빈 문자열)
+    # refresh=True 이면 캐시를 사용하지 않고 새로 생성
+    key = make_key(tool, topic, MODEL, SYSTEM_PROMPT_VERSION)
+    return get_generation_cache().get_or_compute(key, lambda: _create_completion(client, tool, topic), refresh=refresh)
+
+
+def generate_candidates(client, tool, topic, n=CANDIDATE_COUNT, refresh=False):
+    # 후보 프롬프트 n 개를 한 번의 요청으로 받아 목록으로 돌려줌 (실패하면 빈 목록)
+    key = make_key(f"{tool}-candidates-{n}", topic, MODEL, SYSTEM_PROMPT_VERSION)
+    return get_generation_cache().get_or_compute(key, lambda: _create_candidates(client, tool, topic, n), refresh=refresh)
+
+
+def stream_prompt(client, tool, topic, refresh=False):
+    # 응답이 생성되는 대로 텍스트 조각을 하나씩 돌려주는 제너레이터
+    # 캐시에 있거나 같은 요청이 이미 진행 중이면 그 결과를 한 번에 돌려줌
+    # 중간에 멈추면(제너레이터를 닫으면) 서버와의 연결도 함께 닫음
+    cache = get_generation_cache()
+    key = make_key(tool, topic, MODEL, SYSTEM_PROMPT_VERSION)
+
+    if not refresh:
+        cached = cache.lookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        leader, future = cache.claim(key)
+        if not leader:
+            try:
+                yield future.result()
+                return
+            except GenerationAbandoned:
+                # 먼저 시작한 요청이 중지된 경우 직접 생성
+                leader, future = cache.claim(key)
+    else:
+        leader, future = False, None
+
+    text = ""
+    try:
+        for piece in _stream_completion(client, tool, topic):
+            text += piece
+            yield piece
+    except BaseException as e:
+        if leader:
+            cache.abandon(key, future, e if isinstance(e, Exception) and not isinstance(e, GeneratorExit) else None)
+        raise
+
+    if text.strip():
+        if leader:
+            cache.complete(key, future, text.strip())
+        else:
+            cache.put(key, text.strip())
+    elif leader:
+        cache.abandon(key, future)
@@ -0,0 +1,248 @@
+# 외부 호출 시간 측정
+# Drive 검색, open_by_key, col_values, get_all_values, append_rows, OpenAI 호출 등을
+# 페이지/워크시트별로 시간을 재서 히스토그램으로 모읍니다.
+# 결과는 숨겨진 관리자 화면(Home.py?admin=<토큰>)과 Prometheus 텍스트 형식으로 볼 수 있습니다.
+#
+# .streamlit/secrets.toml 설정 예시
+#   [metrics]
+#   admin_token = "..."   # 관리자 화면 접속 토큰
+#   port = 9464           # Prometheus 수집용 HTTP 포트 (환경 변수 AITOOLMAKER_METRICS_PORT 로도 설정 가능)
+#   bind_address = "127.0.0.1"  # /metrics 를 열 주소 (환경 변수 AITOOLMAKER_METRICS_BIND 로도 설정 가능)
+#
+# /metrics 에는 인증이 없으므로 기본으로는 이 서버 안(127.0.0.1)에서만 접속할 수 있습니다.
+# 다른 서버의 Prometheus 가 수집해야 하면 bind_address 를 바꾸고, 방화벽 등으로 접속할 수 있는 곳을 제한하세요.
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.config import get_setting
+
+# 히스토그램 구간(초)
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+# 관리자 화면에 보여 줄 최근 호출 수
+RECENT_SPANS = 500
+# /metrics 서버의 기본 주소 (인증이 없으므로 이 서버 안에서만 접속 가능)
+DEFAULT_BIND_ADDRESS = "127.0.0.1"
+
+# 현재 스크립트 실행이 어느 페이지인지 (백그라운드 스레드는 "background")
+_page = contextvars.ContextVar("metrics_page", default="background")
+# Streamlit 실행 정보가 없는 스레드(공용 스레드 풀의 작업)에 맡긴 세션의 ID (utils.executor 가 설정)
+_session = contextvars.ContextVar("metrics_session", default=None)
+# 그 작업을 맡긴 페이지 실행의 Streamlit 실행 정보 (utils.rate_limit 이 대기 안내를 그 페이지에 그릴 때 사용)
+_caller_ctx = contextvars.ContextVar("metrics_caller_ctx", default=None)
+
+
+def script_run_ctx():
+    # 현재 스레드의 Streamlit 실행 정보 (페이지 실행 스레드가 아니면 None)
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+
+
+def current_session_id():
+    # 이 호출을 요청한 세션 ID (페이지 실행 스레드이거나 그 세션이 공용 스레드 풀에 맡긴 작업), 없으면 None
+    ctx = script_run_ctx()
+    return ctx.session_id if ctx is not None else _session.get()
+
+
+def bind_session(session_id, ctx=None):
+    _session.set(session_id)
+    _caller_ctx.set(ctx)
+
+
+def caller_script_run_ctx():
+    # 이 호출을 요청한 페이지 실행의 Streamlit 실행 정보 (공용 스레드 풀의 작업이면 그 작업을 맡긴 페이지 실행), 없으면 None
+    return script_run_ctx() or _caller_ctx.get()
+
+
+@contextlib.contextmanager
+def attach_script_run_ctx(ctx):
+    # 공용 스레드 풀의 작업 스레드에 ctx 를 잠시 붙여 그 페이지 화면에 그릴 수 있도록 하고, 끝나면 다시 뗌
+    # (떼지 않으면 같은 작업 스레드가 다음에 맡은 다른 세션의 작업에 이 세션의 실행 정보가 남음)
+    thread = threading.current_thread()
+    if ctx is None or script_run_ctx() is not None:
+        yield
+        return
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+    add_script_run_ctx(thread, ctx)
+    try:
+        yield
+    finally:
+        # add_script_run_ctx 에는 떼는 함수가 없으므로 스레드에 붙인 속성을 직접 지움
+        for name, value in list(vars(thread).items()):
+            if value is ctx:
+                delattr(thread, name)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        # 구간 경계 기준의 대략적인 분위수
+        target = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (호출 이름, 페이지, 워크시트) -> Histogram
+        self._recent = deque(maxlen=RECENT_SPANS)
+        self._collectors = []  # Prometheus 출력에 추가할 줄을 만드는 함수
+
+    def observe(self, name, seconds, worksheet="", error=False):
+        page = _page.get()
+        session_id = current_session_id()
+        with self._lock:
+            key = (name, page, worksheet)
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(seconds, error)
+            self._recent.append({
+                "time": time.strftime("%H:%M:%S"),
+                "call": name,
+                "page": page,
+                "worksheet": worksheet,
+                "session": session_id[:8] if session_id else "",
+                "ms": round(seconds * 1000, 1),
+                "error": error,
+            })
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def summary(self):
+        # 관리자 화면용 요약 (총 소요 시간이 큰 순서)
+        with self._lock:
+            rows = [
+                {
+                    "call": name,
+                    "page": page,
+                    "worksheet": worksheet,
+                    "count": h.total,
+                    "errors": h.errors,
+                    "total_s": round(h.sum, 2),
+                    "avg_ms": round(h.sum / h.total * 1000, 1),
+                    "p50_ms": round(h.quantile(0.5) * 1000, 1),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 1),
+                    "max_ms": round(h.max * 1000, 1),
+                }
+                for (name, page, worksheet), h in self._histograms.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def recent(self):
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def render_prometheus(self):
+        lines = [
+            "# HELP aitoolmaker_external_call_seconds Duration of external calls (Sheets, Drive, OpenAI).",
+            "# TYPE aitoolmaker_external_call_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self._histograms.items())
+            collectors = list(self._collectors)
+        for (name, page, worksheet), h in items:
+            labels = f'call="{name}",page="{page}",worksheet="{worksheet}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ["+Inf"], h.counts):
+                cumulative += count
+                lines.append(f'aitoolmaker_external_call_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"aitoolmaker_external_call_seconds_sum{{{labels}}} {h.sum:.6f}")
+            lines.append(f"aitoolmaker_external_call_seconds_count{{{labels}}} {h.total}")
+            lines.append(f"aitoolmaker_external_call_errors_total{{{labels}}} {h.errors}")
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception:
+                pass
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@contextlib.contextmanager
+def span(name, worksheet=""):
+    # with span("sheets.get_all_values", worksheet="시트1"): ... 형태로 호출 시간을 기록
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        registry.observe(name, time.perf_counter() - started, worksheet, error)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server_lock = threading.Lock()
+_server_started = False
+
+
+def _start_metrics_server():
+    # 포트가 설정된 경우에만 /metrics HTTP 서버를 한 번 시작
+    global _server_started
+    with _server_lock:
+        if _server_started:
+            return
+        _server_started = True
+        port = os.environ.get("AITOOLMAKER_METRICS_PORT") or get_setting("metrics", "port")
+        if not port:
+            return
+        host = os.environ.get("AITOOLMAKER_METRICS_BIND") or get_setting("metrics", "bind_address", DEFAULT_BIND_ADDRESS)
+        server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+
+
+def track_page(name):
+    # 페이지 맨 위에서 호출하여 이후의 외부 호출을 이 페이지 이름으로 기록
+    _page.set(name)
+    _start_metrics_server()
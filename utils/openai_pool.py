@@ -0,0 +1,161 @@
+# 여러 OpenAI API 키를 함께 사용하는 클라이언트 풀
+# st.secrets["api"]["keys"] 의 키마다 OpenAI 클라이언트를 하나씩 만들고,
+# 진행 중인 요청 수가 가장 적은 키로 요청을 보냅니다.
+# 429(요청 한도 초과)나 할당량 초과 오류가 나면 그 키를 잠시 쉬게 하고 다른 키로 다시 보냅니다.
+import contextlib
+import threading
+import time
+
+from openai import OpenAI, APIConnectionError, InternalServerError, RateLimitError
+
+# 429 오류를 받은 키를 쉬게 하는 기본 시간(초)
+RATE_LIMIT_COOLDOWN = 30
+# 할당량(quota)이 소진된 키를 쉬게 하는 시간(초)
+QUOTA_COOLDOWN = 10 * 60
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_quota_error(error):
+    return getattr(error, "code", None) == "insufficient_quota" or "quota" in str(error).lower()
+
+
+class KeySlot:
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.cooldown_until = 0.0
+
+
+class OpenAIKeyPool:
+    def __init__(self, keys, client_factory=None):
+        # 재시도는 풀에서 다른 키로 하므로 클라이언트 자체의 재시도는 끔
+        client_factory = client_factory or (lambda key: OpenAI(api_key=key, max_retries=0))
+        self._lock = threading.Lock()
+        self._slots = [KeySlot(key, client_factory(key)) for key in keys]
+        if not self._slots:
+            raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
+
+    def _pick(self, exclude):
+        # 쉬는 중이 아닌 키 중 진행 중인 요청이 가장 적은 키를 고름
+        # 모든 키가 쉬는 중이면 가장 먼저 풀리는 키를 사용
+        now = time.time()
+        candidates = [slot for slot in self._slots if slot not in exclude] or self._slots
+        ready = [slot for slot in candidates if slot.cooldown_until <= now]
+        if ready:
+            return min(ready, key=lambda slot: (slot.in_flight, slot.requests))
+        return min(candidates, key=lambda slot: slot.cooldown_until)
+
+    @contextlib.contextmanager
+    def lease(self, exclude=()):
+        with self._lock:
+            slot = self._pick(exclude)
+            slot.in_flight += 1
+            slot.requests += 1
+        try:
+            yield slot
+        finally:
+            with self._lock:
+                slot.in_flight -= 1
+
+    def _record_failure(self, slot, error):
+        with self._lock:
+            slot.failures += 1
+            if isinstance(error, RateLimitError):
+                slot.rate_limited += 1
+                cooldown = QUOTA_COOLDOWN if _is_quota_error(error) else (_retry_after(error) or RATE_LIMIT_COOLDOWN)
+                slot.cooldown_until = max(slot.cooldown_until, time.time() + cooldown)
+
+    def call(self, fn):
+        # fn(client) 를 실행하고, 한도 초과나 일시적인 오류가 나면 다른 키로 다시 시도
+        tried = []
+        while True:
+            with self.lease(exclude=tried) as slot:
+                try:
+                    return fn(slot.client)
+                except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                    self._record_failure(slot, e)
+                    tried.append(slot)
+                    if len(tried) >= len(self._slots):
+                        raise
+
+    def stream(self, fn):
+        # 스트리밍 응답을 끝까지 읽는 동안 키를 사용 중으로 유지하는 제너레이터
+        # 첫 응답을 받기 전의 오류는 call() 과 같이 다른 키로 다시 시도
+        tried = []
+        while True:
+            with self.lease(exclude=tried) as slot:
+                try:
+                    stream = fn(slot.client)
+                except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                    self._record_failure(slot, e)
+                    tried.append(slot)
+                    if len(tried) >= len(self._slots):
+                        raise
+                    continue
+                with contextlib.closing(stream):
+                    yield from stream
+                return
+
+    def stats(self):
+        # 모니터링용 키별 사용 현황 (키는 끝 4자리만 표시)
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "key": "…" + slot.key[-4:],
+                    "in_flight": slot.in_flight,
+                    "requests": slot.requests,
+                    "failures": slot.failures,
+                    "rate_limited": slot.rate_limited,
+                    "cooldown_remaining": max(0.0, round(slot.cooldown_until - now, 1)),
+                }
+                for slot in self._slots
+            ]
+
+
+class _PooledCompletions:
+    def __init__(self, pool, before_call, instrument):
+        self._pool = pool
+        self._before_call = before_call
+        self._instrument = instrument or contextlib.nullcontext
+
+    def create(self, **kwargs):
+        if self._before_call is not None:
+            self._before_call()
+        if kwargs.get("stream"):
+            # 스트리밍은 첫 응답을 받을 때까지의 시간을 기록
+            instrument = self._instrument
+
+            def open_stream(client):
+                with instrument():
+                    return client.chat.completions.create(**kwargs)
+
+            return self._pool.stream(open_stream)
+        with self._instrument():
+            return self._pool.call(lambda client: client.chat.completions.create(**kwargs))
+
+
+class _PooledChat:
+    def __init__(self, pool, before_call, instrument):
+        self.completions = _PooledCompletions(pool, before_call, instrument)
+
+
+class PooledClient:
+    # OpenAI 클라이언트와 같은 방식(client.chat.completions.create)으로 풀을 사용하기 위한 객체
+    # before_call 은 요청을 보내기 전에 호출되고 (예: 속도 제한),
+    # instrument 는 요청을 감싸는 컨텍스트 매니저를 만드는 함수 (예: 시간 측정)
+    def __init__(self, pool, before_call=None, instrument=None):
+        self.pool = pool
+        self.chat = _PooledChat(pool, before_call, instrument)
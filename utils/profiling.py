@@ -0,0 +1,158 @@
+# 스크립트 실행(rerun) 한 번을 통째로 프로파일링
+# 특정 동작이 왜 느린지(get_all_records 의 JSON 처리, 시작할 때의 import 등) 운영 중에 확인할 때 사용합니다.
+# 꺼져 있을 때는 설정 값만 확인하고 아무 일도 하지 않습니다.
+#
+# 켜는 방법 (셋 중 하나)
+#   환경 변수   AITOOLMAKER_PROFILE=1
+#   secrets     [profiling] enabled = true
+#   주소        ?profile=<토큰>  ([profiling] token 을 설정한 경우에만)
+#
+# 결과는 [profiling] dir (기본값: .data/profiles) 에 실행마다 두 개의 파일로 저장됩니다.
+#   *.prof    cProfile 결과 (snakeviz, flameprof 등으로 보기)
+#   *.folded  일정 간격으로 모은 호출 스택 (flamegraph.pl, speedscope 로 보기)
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import streamlit as st
+
+from utils.config import DATA_DIR, get_setting
+from utils.metrics import script_run_ctx
+
+# 호출 스택을 모으는 간격(초)
+SAMPLE_INTERVAL = 0.005
+
+# 세션별로 진행 중인 프로파일 (중간에 rerun 되어 stop 이 불리지 않은 경우를 정리하기 위함)
+_active = {}
+_active_lock = threading.Lock()
+# cProfile 은 한 번에 하나만 켤 수 있으므로 동시에 요청되면 스택 수집만 함
+_cprofile_lock = threading.Lock()
+
+
+def is_profiling_requested():
+    if os.environ.get("AITOOLMAKER_PROFILE", "") not in ("", "0"):
+        return True
+    if get_setting("profiling", "enabled", False):
+        return True
+    token = get_setting("profiling", "token")
+    if not token:
+        return False
+    try:
+        return st.query_params.get("profile") == token
+    except Exception:
+        return False
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class _StackSampler:
+    # 대상 스레드의 호출 스택을 일정 간격으로 모아 folded 형식으로 저장
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stop = threading.Event()
+        self.stacks = Counter()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                # 대상 스레드가 끝났음 (st.stop() 등으로 stop_profiling 이 불리지 않은 경우)
+                break
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RerunProfile:
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self.thread = threading.current_thread()
+        ctx = script_run_ctx()
+        self.session = "".join(c for c in ctx.session_id[:8] if c.isalnum()) if ctx is not None else "nosession"
+        self.profiler = None
+        if _cprofile_lock.acquire(blocking=False):
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # 다른 프로파일러가 이미 켜져 있음
+                self.profiler = None
+                _cprofile_lock.release()
+        self.sampler = _StackSampler(threading.get_ident())
+        self.sampler.start()
+
+    def finish(self, interrupted=False):
+        if self.profiler is not None:
+            self.profiler.disable()
+            _cprofile_lock.release()
+        self.sampler.stop()
+
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started)) + f"{self.started % 1:.3f}"[1:]
+        suffix = "_interrupted" if interrupted else ""
+        directory = get_setting("profiling", "dir") or os.path.join(DATA_DIR, "profiles")
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{stamp}_{self.page}_{self.session}{suffix}")
+        if self.profiler is not None:
+            self.profiler.dump_stats(base + ".prof")
+        self.sampler.write(base + ".folded")
+        return base
+
+
+def _session_key():
+    ctx = script_run_ctx()
+    return ctx.session_id if ctx is not None else threading.get_ident()
+
+
+def start_profiling(page):
+    # 페이지 맨 위에서 호출. 프로파일링이 꺼져 있으면 None 을 돌려줌
+    # 이전 실행이 st.rerun()/st.stop() 등으로 중간에 멈춰 stop_profiling 이 불리지 않은 프로파일을 정리
+    # 같은 세션의 것과, 다시 실행되지 않은 다른 세션의 것 중 페이지 실행 스레드가 이미 끝난 것
+    # (정리하지 않으면 cProfile 잠금을 계속 잡고 있어 다른 실행에서 cProfile 을 켤 수 없음)
+    key = _session_key()
+    with _active_lock:
+        stale = [_active.pop(key)] if key in _active else []
+        for other in list(_active):
+            if not _active[other].thread.is_alive():
+                stale.append(_active.pop(other))
+    for profile in stale:
+        profile.finish(interrupted=True)
+    if not is_profiling_requested():
+        return None
+    profile = RerunProfile(page)
+    with _active_lock:
+        _active[key] = profile
+    return profile
+
+
+def stop_profiling(profile):
+    # 페이지 맨 아래에서 호출하여 결과 파일을 저장
+    if profile is None:
+        return
+    with _active_lock:
+        _active.pop(_session_key(), None)
+    base = profile.finish()
+    st.caption(f"🔬 프로파일 저장됨: {base}.prof / .folded")
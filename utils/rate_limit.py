@@ -0,0 +1,158 @@
+# 외부 API(Google Sheets/Drive, OpenAI) 호출 속도 제한
+# 서버 프로세스의 모든 세션이 API 별 토큰 버킷 하나를 함께 사용합니다.
+# 토큰이 없으면 바로 실패하지 않고 줄을 서서 기다리며, 세션별로 돌아가며 토큰을 받으므로
+# 한 교사의 많은 요청이 다른 교사의 요청을 오래 막지 않습니다.
+#
+# .streamlit/secrets.toml 설정 예시 (분당 호출 수, 순간 허용량, 최대 대기 시간(초))
+#   [rate_limit]
+#   sheets_read_per_minute = 240
+#   sheets_write_per_minute = 240
+#   openai_per_minute = 300
+#   sheets_read_burst = 20
+#   max_wait = 30
+#
+# Google Sheets 할당량은 프로젝트 단위이므로, 활동을 여러 스프레드시트에 나누어 저장해도(utils.sharding)
+# 모든 스프레드시트의 호출이 같은 토큰 버킷을 사용합니다.
+import threading
+import time
+from collections import OrderedDict, deque
+
+import streamlit as st
+
+from utils.config import get_setting
+from utils.metrics import attach_script_run_ctx, caller_script_run_ctx, current_session_id, span
+
+# API 별 기본 분당 호출 수 (Google Sheets 기본 할당량은 프로젝트당 분당 300회)
+DEFAULT_PER_MINUTE = {
+    "sheets_read": 240,
+    "sheets_write": 240,
+    "drive": 600,
+    "openai": 300,
+}
+DEFAULT_BURST = 20
+DEFAULT_MAX_WAIT = 30
+
+# 어떤 세션의 요청도 아닌 백그라운드 스레드(저장 대기열 등)가 사용하는 세션 ID
+BACKGROUND_SESSION = "background"
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+class FairTokenBucket:
+    def __init__(self, name, rate, capacity, max_wait):
+        self.name = name
+        self._rate = rate  # 초당 토큰 수
+        self._capacity = capacity
+        self._max_wait = max_wait
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()  # 세션 ID -> 대기 중인 티켓 (앞에 있는 세션부터 차례로 처리)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _next_ticket(self):
+        for queue in self._queues.values():
+            return queue[0]
+        return None
+
+    def _position(self, session_id, ticket):
+        # 세션별로 번갈아 처리할 때 이 티켓이 몇 번째로 처리되는지 계산
+        sessions = list(self._queues)
+        index = self._queues[session_id].index(ticket)
+        my_turn = sessions.index(session_id)
+        ahead = 0
+        for turn, other in enumerate(sessions):
+            ahead += min(len(self._queues[other]), index + (1 if turn < my_turn else 0))
+        return ahead + 1
+
+    def _remove(self, session_id, ticket):
+        queue = self._queues.get(session_id)
+        if queue is not None:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[session_id]
+            else:
+                # 처리된 세션은 맨 뒤로 보내 다른 세션이 먼저 받도록 함
+                self._queues.move_to_end(session_id)
+        self._cond.notify_all()
+
+    def acquire(self, session_id, on_wait=None, timeout=None):
+        # 토큰 하나를 받을 때까지 기다림, 최대 대기 시간을 넘기면 RateLimitTimeout
+        timeout = self._max_wait if timeout is None else timeout
+        with self._cond:
+            self._refill()
+            if self._tokens >= 1 and not self._queues:
+                self._tokens -= 1
+                return
+
+            ticket = object()
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            deadline = time.monotonic() + timeout
+            last_position = None
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1 and self._next_ticket() is ticket:
+                        self._tokens -= 1
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RateLimitTimeout("⏳ 요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해 주세요.")
+                    position = self._position(session_id, ticket)
+                    if on_wait is not None and position != last_position:
+                        on_wait(position)
+                        last_position = position
+                    self._cond.wait(min(remaining, max(0.01, (1 - self._tokens) / self._rate)))
+            finally:
+                self._remove(session_id, ticket)
+
+
+# 백그라운드 스레드(저장 대기열 등)에서도 호출되므로 st.cache_resource 대신 모듈 변수에 보관
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(backend):
+    with _limiters_lock:
+        if backend not in _limiters:
+            per_minute = float(get_setting("rate_limit", f"{backend}_per_minute", DEFAULT_PER_MINUTE[backend]))
+            _limiters[backend] = FairTokenBucket(
+                backend,
+                rate=per_minute / 60,
+                capacity=int(get_setting("rate_limit", f"{backend}_burst", DEFAULT_BURST)),
+                max_wait=float(get_setting("rate_limit", "max_wait", DEFAULT_MAX_WAIT))
+            )
+        return _limiters[backend]
+
+
+def throttle(backend):
+    # backend 의 토큰을 받을 때까지 기다림
+    # 페이지 실행 중이면 기다리는 동안 대기 순서를 화면에 표시
+    # 공용 스레드 풀의 작업은 그 작업을 맡긴 세션의 차례로 처리하고, 대기 순서도 그 세션의 페이지에 표시
+    ctx = caller_script_run_ctx()
+    session_id = current_session_id() or BACKGROUND_SESSION
+    placeholder = None
+
+    def on_wait(position):
+        nonlocal placeholder
+        if ctx is None:
+            return
+        with attach_script_run_ctx(ctx):
+            if placeholder is None:
+                placeholder = st.empty()
+            placeholder.info(f"⏳ 사용자가 많아 잠시 기다리는 중입니다... (대기 순서: {position}번째)")
+
+    try:
+        # 기다린 시간도 외부 호출과 함께 기록 (rate_limit.<backend>)
+        with span(f"rate_limit.{backend}"):
+            get_limiter(backend).acquire(session_id, on_wait=on_wait)
+    finally:
+        if placeholder is not None:
+            with attach_script_run_ctx(ctx):
+                placeholder.empty()
@@ -0,0 +1,101 @@
+# 일시적인 오류(429, 5xx, 연결 끊김)가 난 외부 호출을 다시 시도
+# 지수적으로 늘어나는 대기 시간에 무작위 값(jitter)을 섞어 여러 세션이 동시에 다시 몰리지 않도록 하고,
+# 서버가 Retry-After 를 보내면 그 시간만큼은 반드시 기다립니다.
+#
+# .streamlit/secrets.toml 설정 예시
+#   [retry]
+#   attempts = 5      # 최대 시도 횟수 (첫 시도 포함)
+#   base_delay = 0.5  # 첫 번째 재시도 전 최대 대기 시간(초), 시도마다 두 배
+#   max_delay = 30    # 한 번에 기다리는 최대 시간(초), Retry-After 가 이보다 길면 포기
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30
+
+# 다시 시도하면 성공할 수 있는 HTTP 상태 코드
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def _status_code(error):
+    # gspread/requests 는 response.status_code, googleapiclient 는 resp.status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "resp", None), "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # 연결 끊김, 시간 초과 (requests 의 ConnectionError/Timeout 도 OSError 를 상속)
+    return isinstance(error, (ConnectionError, TimeoutError, OSError))
+
+
+def retry_after(error):
+    # 응답의 Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 돌려줌, 없으면 None
+    # requests.Response 는 오류 상태일 때 False 로 평가되므로 None 과 비교
+    response = getattr(error, "response", None)
+    if response is None:
+        response = getattr(error, "resp", None)
+    headers = getattr(response, "headers", None)
+    if headers is None and isinstance(response, dict):
+        headers = response
+    if not headers:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+    # attempt 번째 재시도 전 대기 시간 (0 ~ base_delay * 2^(attempt-1) 사이의 무작위 값)
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+def call_with_retry(fn, on_retry=None, attempts=None, base_delay=None, max_delay=None, sleep=time.sleep):
+    # fn() 을 호출하고, 일시적인 오류면 기다렸다가 다시 호출
+    # on_retry(error, attempt) 는 다시 시도하기 전에 호출됨 (예: 캐시된 색인 새로 고침)
+    attempts = attempts or int(get_setting("retry", "attempts", DEFAULT_ATTEMPTS))
+    base_delay = base_delay if base_delay is not None else float(get_setting("retry", "base_delay", DEFAULT_BASE_DELAY))
+    max_delay = max_delay if max_delay is not None else float(get_setting("retry", "max_delay", DEFAULT_MAX_DELAY))
+
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            attempt += 1
+            if attempt >= attempts or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            wait_hint = retry_after(e)
+            if wait_hint is not None:
+                if wait_hint > max_delay:
+                    raise
+                delay = max(delay, wait_hint)
+            logger.warning("일시적인 오류로 %.1f초 후 다시 시도합니다 (%d/%d): %s", delay, attempt, attempts - 1, e)
+            sleep(delay)
+            if on_retry is not None:
+                on_retry(e, attempt)
@@ -0,0 +1,211 @@
+# 프롬프트 저장 요청을 모아서 한 번에 쓰는 대기열 (write-behind)
+# 페이지는 저장할 행을 대기열에 넣기만 하고, 백그라운드 스레드가 워크시트별로 모아
+# 저장소(utils.storage)에 한 번에 기록합니다. 대기 중인 행은 로컬 저널 파일에 먼저 기록되므로
+# 서버가 중간에 종료되어도 다음 실행 때 이어서 기록됩니다.
+# 다시 시도해도 기록할 수 없는 행(예: 셀 크기 초과)은 실패 파일로 옮겨, 같은 워크시트의 다른 저장을 막지 않습니다.
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from utils.config import data_path
+from utils.rate_limit import RateLimitTimeout
+from utils.retry import is_retryable
+from utils.storage import get_store
+
+logger = logging.getLogger(__name__)
+
+# 저장 상태
+QUEUED = "queued"
+COMMITTED = "committed"
+FAILED = "failed"
+
+# 요청을 모으기 위해 기다리는 시간(초)
+FLUSH_INTERVAL = 0.25
+# 페이지가 실제 기록 완료를 기다리는 최대 시간(초) - 이 시간이 지나면 "queued" 로 응답
+COMMIT_WAIT = 1.5
+# 기록 실패 시 다시 시도하기까지 기다리는 최대 시간(초)
+MAX_RETRY_DELAY = 60
+# 완료된 요청의 상태를 보관하는 시간(초)
+STATUS_TTL = 10 * 60
+
+
+class SaveFailed(Exception):
+    # 다시 시도해도 기록할 수 없어 실패 파일로 옮긴 저장 요청
+    pass
+
+
+class SaveQueue:
+    def __init__(self, journal_path, store, flush_interval=FLUSH_INTERVAL, failed_path=None):
+        self._journal_path = journal_path
+        self._failed_path = failed_path or journal_path + ".failed"
+        self._store = store
+        self._flush_interval = flush_interval
+        self._cond = threading.Condition()
+        self._pending = []  # [{"id": ..., "sheet": 워크시트 이름, "row": [...]}]
+        self._status = {}  # 요청 id -> (상태, 변경 시각)
+        self._errors = {}  # 실패한 요청 id -> 오류 내용
+        self._failures = 0
+        self._load_journal()
+        threading.Thread(target=self._run, name="save-queue-flusher", daemon=True).start()
+
+    def _load_journal(self):
+        # 이전 실행에서 기록하지 못한 행을 다시 대기열에 넣음
+        # 줄을 쓰는 도중에 서버가 종료되어 잘린 줄은 건너뛰고, 읽은 항목만으로 저널을 다시 씀
+        # (그대로 두면 다음 항목이 잘린 줄 뒤에 이어 붙어 함께 읽을 수 없게 됨)
+        try:
+            with open(self._journal_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        broken = 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                broken += 1
+                continue
+            self._pending.append(entry)
+            self._status[entry["id"]] = (QUEUED, time.time())
+        if broken:
+            logger.warning("저장 대기열 저널 %s 에서 읽을 수 없는 줄 %d개를 건너뛰었습니다.", self._journal_path, broken)
+            self._rewrite_journal()
+
+    def _append_journal(self, entry, path=None):
+        with open(path or self._journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_journal(self):
+        tmp_path = self._journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self._pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._journal_path)
+
+    def submit(self, sheet, row, wait=COMMIT_WAIT):
+        # 행을 대기열에 넣고, wait 초 안에 기록되면 "committed", 아니면 "queued" 를 돌려줌
+        # wait 초 안에 기록할 수 없는 행으로 판정되면 SaveFailed 를 발생
+        # 행에 저장 요청 키(F열)가 있으면 요청 id 로 사용하여, 같은 요청이 두 번 들어오면 처음 요청의 상태를 기다림
+        key = row[5] if len(row) > 5 and row[5] else None
+        entry = {"id": key or uuid.uuid4().hex, "sheet": sheet, "row": row}
+        with self._cond:
+            if entry["id"] not in self._status:
+                self._append_journal(entry)
+                self._pending.append(entry)
+                self._status[entry["id"]] = (QUEUED, time.time())
+                self._cond.notify_all()
+
+            deadline = time.time() + wait
+            while self._status[entry["id"]][0] == QUEUED:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            state = self._status[entry["id"]][0]
+            if state == FAILED:
+                raise SaveFailed(self._errors.get(entry["id"], ""))
+            return state
+
+    def status(self, entry_id):
+        with self._cond:
+            return self._status.get(entry_id, (None, None))[0]
+
+    def pending_rows(self):
+        # 아직 시트에 기록되지 않은 행 목록
+        with self._cond:
+            return [entry["row"] for entry in self._pending]
+
+    def failed_entries(self):
+        # 실패 파일로 옮긴 저장 요청 목록 (관리자가 확인 후 직접 처리)
+        try:
+            with open(self._failed_path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # 잠시 기다리며 다른 세션의 저장 요청도 함께 모음
+            time.sleep(self._flush_interval)
+            if not self.flush():
+                self._failures += 1
+                time.sleep(min(MAX_RETRY_DELAY, self._flush_interval * 2 ** self._failures))
+            else:
+                self._failures = 0
+
+    def flush(self):
+        # 대기 중인 행을 워크시트별로 묶어 한 번씩 기록, 일시적인 오류 없이 끝나면 True
+        with self._cond:
+            batch = list(self._pending)
+
+        groups = {}
+        for entry in batch:
+            groups.setdefault(entry["sheet"], []).append(entry)
+
+        ok = True
+        for sheet, entries in groups.items():
+            done, failed = [], []
+            if not self._insert(sheet, entries, done, failed):
+                ok = False
+            if done or failed:
+                self._finish(done, failed)
+        return ok
+
+    def _insert(self, sheet, entries, done, failed):
+        # entries 를 한 번에 기록하고, 다시 시도해도 소용없는 오류면 반으로 나누어 문제가 되는 행만 골라냄
+        # 기록한 항목은 done 에, 기록할 수 없는 항목은 (항목, 오류) 로 failed 에 넣고, 일시적인 오류가 있었으면 False
+        try:
+            self._store.insert_many(sheet, [entry["row"] for entry in entries])
+            done.extend(entries)
+            return True
+        except Exception as e:
+            logger.exception("%s 워크시트에 저장 요청 %d건을 기록하지 못했습니다.", sheet, len(entries))
+            error = e
+        # 속도 제한 대기 시간을 넘긴 경우도 일시적인 오류로 보고 저널에 남겨 다음 기록 때 다시 시도
+        if is_retryable(error) or isinstance(error, RateLimitTimeout):
+            return False
+        if len(entries) == 1:
+            failed.append((entries[0], error))
+            return True
+        middle = len(entries) // 2
+        first = self._insert(sheet, entries[:middle], done, failed)
+        second = self._insert(sheet, entries[middle:], done, failed)
+        return first and second
+
+    def _finish(self, done, failed):
+        # 기록한 항목과 실패 파일로 옮긴 항목을 대기열과 저널에서 뺌
+        with self._cond:
+            now = time.time()
+            for entry, error in failed:
+                self._append_journal(dict(entry, error=f"{type(error).__name__}: {error}", failed_at=now), self._failed_path)
+                self._status[entry["id"]] = (FAILED, now)
+                self._errors[entry["id"]] = str(error)
+            for entry in done:
+                self._status[entry["id"]] = (COMMITTED, now)
+            finished = {entry["id"] for entry in done} | {entry["id"] for entry, _ in failed}
+            self._pending = [entry for entry in self._pending if entry["id"] not in finished]
+            for entry_id, (state, changed_at) in list(self._status.items()):
+                if state != QUEUED and now - changed_at > STATUS_TTL:
+                    del self._status[entry_id]
+                    self._errors.pop(entry_id, None)
+            self._rewrite_journal()
+            self._cond.notify_all()
+
+
+@st.cache_resource(show_spinner=False)
+def get_save_queue():
+    return SaveQueue(data_path("save_journal.jsonl"), get_store(), failed_path=data_path("save_failed.jsonl"))
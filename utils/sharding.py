@@ -0,0 +1,50 @@
+# 활동 기록을 여러 스프레드시트(샤드)에 나누어 저장
+# 활동 코드의 해시 값으로 저장할 스프레드시트를 정하므로, 한 활동의 조회/중복 확인/삭제는
+# 그 활동이 들어 있는 스프레드시트 하나에만 요청합니다.
+# 스프레드시트마다 셀 수 제한이 따로 있으므로 샤드를 늘리면 저장할 수 있는 행 수가 늘어납니다.
+# (호출 할당량은 프로젝트 단위이므로 샤드 수와 관계없이 utils.rate_limit 의 토큰 버킷 하나를 함께 사용)
+#
+# .streamlit/secrets.toml 설정 예시 (모든 스프레드시트는 같은 폴더에 있고 시트1~3 워크시트가 있어야 함)
+#   [google]
+#   shard_names = ["aitoolmaker", "aitoolmaker-2", "aitoolmaker-3"]
+#
+# 샤드는 목록의 끝에만 추가해야 합니다. 추가한 뒤에는 tools/rebalance_shards.py 로
+# 새 샤드로 옮겨야 하는 행(약 1/N)을 옮깁니다.
+import hashlib
+
+from utils.config import get_setting
+
+
+def _code_hash(code):
+    # 파이썬의 hash() 는 프로세스마다 달라지므로 고정된 해시 사용
+    return int.from_bytes(hashlib.sha1(code.encode("utf-8")).digest()[:8], "big")
+
+
+def jump_hash(key, num_buckets):
+    # Jump consistent hash (Lamping & Veach): 버킷이 N 에서 N+1 로 늘면 키의 1/(N+1) 만 새 버킷으로 이동
+    b, j = -1, 0
+    while j < num_buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+class ShardRouter:
+    # 라우팅 표: 샤드 번호 → 스프레드시트 이름
+    def __init__(self, shard_names):
+        if not shard_names:
+            raise ValueError("샤드가 하나 이상 있어야 합니다.")
+        self.shard_names = list(shard_names)
+
+    def shard_index(self, code):
+        return jump_hash(_code_hash(code), len(self.shard_names))
+
+    def shard_for(self, code):
+        return self.shard_names[self.shard_index(code)]
+
+
+def get_shard_names():
+    # 샤드를 설정하지 않으면 None (스프레드시트 하나만 사용)
+    names = get_setting("google", "shard_names")
+    return list(names) if names else None
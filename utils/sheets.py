@@ -0,0 +1,216 @@
+# 스프레드시트 ID와 워크시트 핸들 캐시
+# (folder_id, spreadsheet_name) → 스프레드시트 ID 를 메모리와 디스크에 TTL 과 함께 보관하여,
+# 매 실행마다 Drive 검색과 open_by_key 를 반복하지 않도록 합니다.
+# 캐시된 ID 로 호출했는데 "찾을 수 없음" 오류가 나면 그때만 다시 검색합니다.
+import json
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+
+from utils.clients import get_gspread_client, get_drive_service, execute_drive
+from utils.config import FOLDER_ID, get_setting, data_path
+from utils.metrics import span
+from utils.rate_limit import throttle
+
+# 디스크에 저장한 스프레드시트 ID 의 유효시간(초)
+SPREADSHEET_ID_TTL = 24 * 60 * 60
+
+# 시트 내용을 바꾸는 Worksheet 메서드 (나머지는 읽기 호출로 속도 제한)
+WRITE_METHODS = {
+    "append_row", "append_rows", "update", "update_cell", "update_cells", "batch_update",
+    "delete_rows", "delete_row", "insert_row", "insert_rows", "clear", "batch_clear",
+    "resize", "add_rows", "add_cols",
+}
+
+
+def is_not_found(error):
+    # 스프레드시트/워크시트가 삭제되었거나 ID 가 바뀐 경우인지 확인
+    # gspread 를 아직 불러오지 않았다면 gspread 오류일 수 없으므로 새로 불러오지 않음
+    exceptions = sys.modules.get("gspread.exceptions")
+    if exceptions is None:
+        return False
+    if isinstance(error, (exceptions.SpreadsheetNotFound, exceptions.WorksheetNotFound)):
+        return True
+    if isinstance(error, exceptions.APIError):
+        response = getattr(error, "response", None)
+        return getattr(response, "status_code", None) == 404
+    return False
+
+
+class SpreadsheetResolver:
+    def __init__(self, cache_path, ttl=SPREADSHEET_ID_TTL):
+        self._cache_path = cache_path
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._ids = {}  # "folder_id/name" -> [spreadsheet_id, 찾은 시각]
+        self._handles = {}  # spreadsheet_id -> (Spreadsheet, {워크시트 이름: Worksheet})
+        self._open_locks = {}  # "folder_id/name" -> 처음 열기를 한 번만 하도록 막는 잠금
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self._cache_path, encoding="utf-8") as f:
+                self._ids = json.load(f)
+        except (OSError, ValueError):
+            self._ids = {}
+
+    def _save(self):
+        # 임시 파일에 쓴 뒤 교체하여 여러 세션이 동시에 저장해도 파일이 깨지지 않도록 함
+        tmp_path = f"{self._cache_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._ids, f, ensure_ascii=False)
+        os.replace(tmp_path, self._cache_path)
+
+    def resolve_id(self, folder_id, name):
+        key = f"{folder_id}/{name}"
+        with self._lock:
+            entry = self._ids.get(key)
+            if entry and time.time() - entry[1] < self._ttl:
+                return entry[0]
+
+        # 폴더 내의 스프레드시트 파일 검색
+        query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name='{name}'"
+        throttle("drive")
+        with span("drive.files.list"):
+            results = execute_drive(get_drive_service().files().list(q=query))
+        items = results.get('files', [])
+        if not items:
+            from gspread.exceptions import SpreadsheetNotFound
+            raise SpreadsheetNotFound(name)
+
+        spreadsheet_id = items[0]['id']
+        with self._lock:
+            self._ids[key] = [spreadsheet_id, time.time()]
+            self._save()
+        return spreadsheet_id
+
+    def open(self, folder_id, name):
+        # 스프레드시트와 모든 워크시트 핸들을 한 번에 가져와 보관
+        # 여러 워크시트를 동시에 처음 읽을 때 검색과 열기는 한 스레드만 하고 나머지는 그 결과를 사용
+        with self._lock:
+            open_lock = self._open_locks.setdefault(f"{folder_id}/{name}", threading.Lock())
+        with open_lock:
+            return self._open(folder_id, name)
+
+    def _open(self, folder_id, name):
+        spreadsheet_id = self.resolve_id(folder_id, name)
+        with self._lock:
+            handles = self._handles.get(spreadsheet_id)
+        if handles is None:
+            throttle("sheets_read")
+            with span("sheets.open_by_key"):
+                spreadsheet = get_gspread_client().open_by_key(spreadsheet_id)
+            throttle("sheets_read")
+            with span("sheets.worksheets"):
+                handles = (spreadsheet, {ws.title: ws for ws in spreadsheet.worksheets()})
+            with self._lock:
+                self._handles[spreadsheet_id] = handles
+        return handles
+
+    def worksheet(self, folder_id, name, title):
+        worksheets = self.open(folder_id, name)[1]
+        if title not in worksheets:
+            from gspread.exceptions import WorksheetNotFound
+            raise WorksheetNotFound(title)
+        return worksheets[title]
+
+    def add_worksheet(self, folder_id, name, title, header=None):
+        # 워크시트가 없으면 새로 만들고 (header 가 있으면 첫 행에 기록) 핸들 캐시에 추가
+        spreadsheet, worksheets = self.open(folder_id, name)
+        if title in worksheets:
+            return worksheets[title]
+        throttle("sheets_write")
+        with span("sheets.add_worksheet", worksheet=title):
+            worksheet = spreadsheet.add_worksheet(title=title, rows=1000, cols=max(len(header or []), 26))
+        if header:
+            throttle("sheets_write")
+            with span("sheets.append_row", worksheet=title):
+                worksheet.append_row(header)
+        with self._lock:
+            worksheets[title] = worksheet
+        return worksheet
+
+    def invalidate(self, folder_id, name):
+        key = f"{folder_id}/{name}"
+        with self._lock:
+            entry = self._ids.pop(key, None)
+            if entry:
+                self._handles.pop(entry[0], None)
+                self._save()
+
+
+class ResolvedWorksheet:
+    # gspread Worksheet 를 감싸는 객체
+    # 메서드를 호출할 때마다 읽기/쓰기 속도 제한을 적용하고 호출 시간을 기록하며,
+    # 호출이 "찾을 수 없음" 오류로 실패하면 캐시를 지우고 다시 찾아 한 번 더 호출합니다.
+    def __init__(self, resolver, folder_id, name, title):
+        self._resolver = resolver
+        self._folder_id = folder_id
+        self._name = name
+        self.title = title
+
+    def _worksheet(self):
+        return self._resolver.worksheet(self._folder_id, self._name, self.title)
+
+    def delete_row_ranges(self, runs):
+        # 여러 행 구간 [(시작, 끝), ...] 을 batch_update 요청 한 번으로 삭제
+        # 요청은 순서대로 적용되므로 아래 구간부터 지워 앞 구간의 행 번호가 바뀌지 않도록 함
+        worksheet = self._worksheet()
+        requests = [
+            {"deleteDimension": {"range": {
+                "sheetId": worksheet.id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end
+            }}}
+            for start, end in sorted(runs, reverse=True)
+        ]
+        throttle("sheets_write")
+        with span("sheets.batch_update", worksheet=self.title):
+            return worksheet.spreadsheet.batch_update({"requests": requests})
+
+    def __getattr__(self, attr):
+        value = getattr(self._worksheet(), attr)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            throttle("sheets_write" if attr in WRITE_METHODS else "sheets_read")
+            try:
+                with span(f"sheets.{attr}", worksheet=self.title):
+                    return getattr(self._worksheet(), attr)(*args, **kwargs)
+            except Exception as e:
+                if not is_not_found(e):
+                    raise
+                self._resolver.invalidate(self._folder_id, self._name)
+                with span(f"sheets.{attr}", worksheet=self.title):
+                    return getattr(self._worksheet(), attr)(*args, **kwargs)
+
+        return call
+
+
+@st.cache_resource(show_spinner=False)
+def get_resolver():
+    return SpreadsheetResolver(data_path("spreadsheet_ids.json"))
+
+
+def open_worksheet(title, folder_id=FOLDER_ID, spreadsheet_name=None):
+    # 워크시트를 찾아 돌려줌 (찾을 수 없으면 SpreadsheetNotFound/WorksheetNotFound 발생)
+    if spreadsheet_name is None:
+        spreadsheet_name = get_setting("google", "spreadsheet_name")
+    resolver = get_resolver()
+    try:
+        resolver.worksheet(folder_id, spreadsheet_name, title)
+    except Exception as e:
+        if not is_not_found(e):
+            raise
+        resolver.invalidate(folder_id, spreadsheet_name)
+        resolver.worksheet(folder_id, spreadsheet_name, title)
+    return ResolvedWorksheet(resolver, folder_id, spreadsheet_name, title)
+
+
+def ensure_worksheet(title, folder_id=FOLDER_ID, spreadsheet_name=None, header=None):
+    # 워크시트가 없으면 만듦 (예: 보관용 워크시트)
+    if spreadsheet_name is None:
+        spreadsheet_name = get_setting("google", "spreadsheet_name")
+    get_resolver().add_worksheet(folder_id, spreadsheet_name, title, header)
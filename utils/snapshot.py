@@ -0,0 +1,216 @@
+# 학생용 앱이 읽는 활동 코드 → (활동 유형, 프롬프트) 스냅샷 파일
+# 저장/삭제할 때마다 메모리의 목록을 고치고, 잠시 모았다가 활동 코드 순으로 정렬된 파일 하나로 다시 씁니다.
+# 파일은 임시 파일에 쓴 뒤 이름을 바꾸므로 읽는 쪽은 항상 완성된 파일만 보고,
+# SnapshotReader 는 파일을 메모리 맵으로 열어 이진 탐색하므로 학생들이 코드를 입력해도 Sheets 를 읽지 않습니다.
+#
+# .streamlit/secrets.toml 설정 예시 (path 가 없으면 스냅샷을 만들지 않음)
+#   [snapshot]
+#   path = "/shared/activities.snap"  # 학생용 앱과 함께 쓰는 경로
+#   rebuild_interval = 300            # 다른 서버의 변경까지 반영하도록 전체 목록을 다시 만드는 주기(초)
+#
+# 파일 형식 (리틀 엔디언)
+#   머리글: 매직(8바이트) "ATMSNAP\0", 형식 번호(uint32), 스냅샷 버전(uint64), 항목 수(uint32)
+#   항목 위치 표: 항목 수 × uint64 (파일 처음부터의 위치, 활동 코드 순)
+#   항목: 코드 길이(uint16), 유형 길이(uint16), 프롬프트 길이(uint32), 코드, 유형, 프롬프트 (UTF-8)
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+from utils.config import ACTIVITY_SHEETS, get_setting
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ATMSNAP\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQI")
+OFFSET = struct.Struct("<Q")
+ENTRY = struct.Struct("<HHI")
+
+# 워크시트 → 학생용 앱의 활동 유형
+SHEET_TYPES = {"시트1": "vision", "시트2": "text", "시트3": "image"}
+
+# 저장/삭제 후 파일을 다시 쓰기 전에 기다리는 시간(초) - 그동안의 변경을 한 번에 기록
+WRITE_DELAY = 1.0
+DEFAULT_REBUILD_INTERVAL = 5 * 60
+
+
+def write_snapshot(path, entries, version):
+    # entries: {활동 코드: (유형, 프롬프트)} 를 코드 순으로 정렬하여 path 에 원자적으로 기록
+    codes = sorted(entries)
+    offsets = []
+    body = bytearray()
+    position = HEADER.size + OFFSET.size * len(codes)
+    for code in codes:
+        activity_type, prompt = entries[code]
+        parts = [value.encode("utf-8") for value in (code, activity_type, prompt)]
+        offsets.append(position + len(body))
+        body += ENTRY.pack(*(len(part) for part in parts))
+        body += b"".join(parts)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, len(codes)))
+        f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotReader:
+    # 스냅샷 파일을 메모리 맵으로 열어 활동 코드를 이진 탐색
+    # refresh() 는 파일이 새로 기록되었으면 다시 엶 (이미 연 맵은 이전 파일을 계속 가리킴)
+    def __init__(self, path):
+        self._path = path
+        self._map = None
+        self._inode = None
+        self.version = None
+        self._count = 0
+        self.refresh()
+
+    def refresh(self):
+        stat = os.stat(self._path)
+        if (stat.st_ino, stat.st_mtime_ns) == self._inode:
+            return False
+        with open(self._path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, version, count = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            mapped.close()
+            raise ValueError(f"스냅샷 파일 형식이 올바르지 않습니다: {self._path}")
+        if self._map is not None:
+            self._map.close()
+        self._map, self._inode = mapped, (stat.st_ino, stat.st_mtime_ns)
+        self.version, self._count = version, count
+        return True
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, i):
+        position = OFFSET.unpack_from(self._map, HEADER.size + OFFSET.size * i)[0]
+        code_length, type_length, prompt_length = ENTRY.unpack_from(self._map, position)
+        start = position + ENTRY.size
+        code = self._map[start:start + code_length]
+        return code, start + code_length, type_length, prompt_length
+
+    def get(self, code):
+        # 활동 코드의 (유형, 프롬프트), 없으면 None
+        key = code.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._entry(mid)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low == self._count:
+            return None
+        found, start, type_length, prompt_length = self._entry(low)
+        if found != key:
+            return None
+        activity_type = self._map[start:start + type_length].decode("utf-8")
+        start += type_length
+        return activity_type, self._map[start:start + prompt_length].decode("utf-8")
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def _read_version(path):
+    try:
+        with open(path, "rb") as f:
+            magic, format_version, version, _ = HEADER.unpack(f.read(HEADER.size))
+        return version if magic == MAGIC else 0
+    except (OSError, struct.error):
+        return 0
+
+
+class SnapshotPublisher:
+    # 저장소의 저장/삭제를 메모리 목록에 반영하고, 백그라운드 스레드가 잠시 모았다가 파일로 기록
+    def __init__(self, path, store, rebuild_interval=DEFAULT_REBUILD_INTERVAL, write_delay=WRITE_DELAY):
+        self.path = path
+        self._store = store
+        self._rebuild_interval = rebuild_interval
+        self._write_delay = write_delay
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._entries = {}  # 활동 코드 -> (유형, 프롬프트)
+        self._rebuild_requested = True  # 처음에는 저장소의 전체 목록으로 만듦
+        self._written = None  # 마지막으로 파일에 기록한 목록
+        self.version = _read_version(path)
+        self._changed.set()
+        threading.Thread(target=self._run, name="snapshot-writer", daemon=True).start()
+
+    def put(self, sheet, code, prompt):
+        if sheet not in SHEET_TYPES or not code:
+            return
+        with self._lock:
+            self._entries[code] = (SHEET_TYPES[sheet], prompt)
+        self._changed.set()
+
+    def remove(self, code):
+        with self._lock:
+            self._entries.pop(code, None)
+        self._changed.set()
+
+    def request_rebuild(self):
+        # 다른 서버가 저장한 활동처럼 이 서버를 거치지 않은 변경이 있을 때
+        with self._lock:
+            self._rebuild_requested = True
+        self._changed.set()
+
+    def rebuild(self):
+        # 저장소의 기록(메모리 색인)으로 전체 목록을 다시 만듦
+        # 다시 만드는 동안 들어온 저장/삭제가 사라지지 않도록 잠금을 잡은 채로 읽음
+        with self._lock:
+            entries = {}
+            for sheet in ACTIVITY_SHEETS:
+                for record in self._store.records(sheet):
+                    if record["setting_name"]:
+                        entries[record["setting_name"]] = (SHEET_TYPES[sheet], record["prompt"])
+            self._entries = entries
+            self._rebuild_requested = False
+
+    def write(self):
+        # 마지막으로 기록한 내용과 같으면 다시 쓰지 않음 (버전은 내용이 바뀔 때만 올라감)
+        with self._lock:
+            if self._entries == self._written:
+                return False
+            entries = dict(self._entries)
+            self.version += 1
+            version = self.version
+        write_snapshot(self.path, entries, version)
+        self._written = entries
+        return True
+
+    def _run(self):
+        while True:
+            if not self._changed.wait(self._rebuild_interval):
+                self.request_rebuild()
+            # 잠시 기다리며 이어지는 저장/삭제를 함께 모음
+            time.sleep(self._write_delay)
+            self._changed.clear()
+            try:
+                if self._rebuild_requested:
+                    self.rebuild()
+                self.write()
+            except Exception:
+                logger.exception("스냅샷 파일을 기록하지 못했습니다.")
+
+
+def make_snapshot_publisher(store):
+    # [snapshot] path 가 없으면 None
+    path = get_setting("snapshot", "path")
+    if not path:
+        return None
+    return SnapshotPublisher(
+        path,
+        store,
+        rebuild_interval=float(get_setting("snapshot", "rebuild_interval", DEFAULT_REBUILD_INTERVAL))
+    )
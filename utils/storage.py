@@ -0,0 +1,819 @@
+# 활동 기록 저장소
+# 페이지와 저장 대기열은 이 인터페이스만 사용하므로, 설정에 따라
+# Google Sheets 또는 로컬 SQLite 에 기록을 보관할 수 있습니다.
+#
+# .streamlit/secrets.toml 설정 예시
+#   [storage]
+#   backend = "sqlite"          # "sheets"(기본값) 또는 "sqlite"
+#   sqlite_path = "/data/activities.sqlite3"
+#   mirror_to_sheets = true     # SQLite 에 쓴 내용을 Google Sheets 에도 복사
+#
+# [google] shard_names 를 설정하면 Google Sheets 기록을 여러 스프레드시트에 나누어 저장합니다. (utils.sharding)
+#
+# Google Sheets 저장소는 다른 서버나 사람이 추가한 행을 주기적으로 동기화합니다.
+# 마지막으로 확인한 행부터 끝까지만 읽으므로, 읽는 양은 전체 기록이 아니라 새로 추가된 행 수에 비례합니다.
+#   [sync]
+#   interval = 30                 # 동기화 주기(초)
+#   full_reload_interval = 21600  # 중간 행을 직접 고친 경우에 대비해 전체를 다시 읽는 주기(초)
+import bisect
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from utils.config import ACTIVITY_SHEETS, get_setting, data_path
+from utils.executor import run_all
+from utils.retry import call_with_retry
+from utils.sharding import ShardRouter, get_shard_names
+from utils.sheets import ensure_worksheet, open_worksheet
+from utils.snapshot import make_snapshot_publisher
+
+logger = logging.getLogger(__name__)
+
+# 시트의 열 순서와 같은 레코드 필드 (A: 저장 시각, B: 활동 코드, C: 프롬프트, D: 이메일, E: 비밀번호, F: 저장 요청 키)
+# 저장 요청 키(idempotency_key)는 저장 한 번마다 새로 만드는 값으로, 같은 요청이 다시 시도되거나
+# 두 번 제출되어도 행이 한 번만 기록되도록 합니다. (이전에 저장된 행은 비어 있음)
+FIELDS = ["timestamp", "setting_name", "prompt", "email", "password", "idempotency_key"]
+
+DEFAULT_SYNC_INTERVAL = 30
+DEFAULT_FULL_RELOAD_INTERVAL = 6 * 60 * 60
+
+
+def row_to_record(row):
+    row = list(row) + [""] * (len(FIELDS) - len(row))
+    return dict(zip(FIELDS, row[:len(FIELDS)]))
+
+
+def record_to_row(record):
+    return [record.get(field, "") for field in FIELDS]
+
+
+def hash_password(password):
+    # 색인에는 비밀번호 원문 대신 해시 값을 사용
+    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+
+def _appended_start_row(response):
+    # append_rows 응답의 updatedRange (예: "'시트1'!A101:E102") 에서 첫 행 번호를 읽음
+    updated_range = ((response or {}).get("updates") or {}).get("updatedRange", "")
+    match = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(match.group(1)) if match else None
+
+
+def _row_checksum(row):
+    # 행 내용의 체크섬 (API 는 뒤쪽 빈 셀을 생략하므로 FIELDS 길이로 맞춘 뒤 계산)
+    values = record_to_row(row_to_record(row))
+    return hashlib.sha1("\x1f".join(str(value) for value in values).encode("utf-8")).hexdigest()
+
+
+def _contiguous_runs(numbers):
+    # 정렬된 행 번호를 이어진 구간 [(시작, 끝), ...] 으로 묶음
+    runs = []
+    for number in numbers:
+        if runs and runs[-1][1] == number - 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+    return [tuple(run) for run in runs]
+
+
+def _already_saved(keys, row):
+    # 저장 요청 키가 있는 행이 이미 기록되었는지 확인
+    key = row_to_record(row)["idempotency_key"]
+    return bool(key) and key in keys
+
+
+class ActivityStore:
+    # 저장소 공통 인터페이스
+    # 행(row)은 FIELDS 순서의 리스트, 레코드(record)는 FIELDS 를 키로 하는 딕셔너리입니다.
+
+    def insert_many(self, sheet, rows):
+        raise NotImplementedError
+
+    def insert(self, sheet, row):
+        self.insert_many(sheet, [row])
+
+    def get(self, code):
+        # 활동 코드로 (시트 이름, 레코드) 를 찾음, 없으면 None
+        raise NotImplementedError
+
+    def list_by_password(self, sheet, password):
+        raise NotImplementedError
+
+    def delete(self, sheet, code, password_hash=None):
+        # 삭제했으면 True, 해당 코드가 없으면 False
+        # password_hash 를 주면 그 비밀번호로 저장한 행만 지움 (같은 코드의 다른 교사 행은 남김)
+        raise NotImplementedError
+
+    def all_codes(self):
+        raise NotImplementedError
+
+    def code_exists(self, code):
+        return self.get(code) is not None
+
+    def records(self, sheet):
+        # 워크시트의 모든 레코드
+        raise NotImplementedError
+
+    def codes(self, sheet):
+        return [record["setting_name"] for record in self.records(sheet)]
+
+    def delete_many(self, sheet, codes, drop_blank=False, password_hash=None):
+        # 여러 코드를 삭제하고 실제로 삭제한 코드 목록을 돌려줌 (drop_blank: 빈 행도 함께 지움)
+        # password_hash 를 주면 그 비밀번호로 저장한 행만 지움
+        return [code for code in dict.fromkeys(codes) if self.delete(sheet, code, password_hash)]
+
+    def move(self, source, target, records, drop_blank=False):
+        # source 워크시트의 records 를 target 워크시트로 옮기고, 옮긴 활동 코드를 돌려줌
+        # target 에 먼저 기록한 뒤 기록된 것을 확인한 코드만 source 에서 지움 (drop_blank: source 의 빈 행도 함께 지움)
+        moved = []
+        if records:
+            self.insert_many(target, [record_to_row(record) for record in records])
+            written = set(self.codes(target))
+            moved = list(dict.fromkeys(record["setting_name"] for record in records if record["setting_name"] in written))
+        if moved or drop_blank:
+            self.delete_many(source, moved, drop_blank)
+        return moved
+
+    def ensure_sheet(self, sheet):
+        # 워크시트가 없으면 만듦 (워크시트를 미리 만들어야 하는 저장소만 구현)
+        pass
+
+    def sync(self):
+        # 다른 서버나 사람이 새로 추가한 활동 코드 (주기적으로 동기화하는 저장소만 구현)
+        return []
+
+
+class SheetIndex:
+    # 워크시트 하나의 메모리 색인
+    # 행 번호 → 레코드, 활동 코드 → 행 번호, 비밀번호 해시 → {행 번호: 레코드} 를 보관하여
+    # 조회와 삭제가 시트 크기와 관계없이 해당 교사의 행만 다루도록 합니다.
+    # 같은 활동 코드가 여러 행에 있어도(예: 예전에 동시에 저장된 경우) 모든 행을 보관하고, 코드로 찾을 때는 첫 행을 사용합니다.
+    def __init__(self, rows, header=None):
+        self.rows = {}  # 시트의 실제 행 번호 -> 레코드 (활동 코드가 있는 행)
+        self.blank_rows = set()  # 활동 코드(B열)가 빈 행 번호
+        self.row_numbers = {}  # 활동 코드 -> 그 코드가 있는 행 번호들 (위에서부터)
+        self.by_password = {}  # 비밀번호 해시 -> {행 번호: 레코드}
+        self.keys = set()  # 이미 기록된 저장 요청 키
+        self.changes = 0  # 행을 더하거나 지운 횟수 (잠금 밖에서 기록하는 동안 색인이 바뀌었는지 확인할 때 사용)
+        for offset, row in enumerate(rows):
+            self.add(offset + 2, row_to_record(row))  # 첫 행은 제목
+        # 증분 동기화 상태: 마지막 행 번호와 그 행의 체크섬 (모르면 None → 다음 동기화 때 전체를 다시 읽음)
+        self.track(len(rows) + 1, rows[-1] if rows else header)
+        self.loaded_at = self.synced_at = time.time()
+
+    def track(self, row_number, row):
+        self.row_count = row_number
+        self.last_checksum = _row_checksum(row) if row is not None else None
+
+    def add(self, row_number, record):
+        self.changes += 1
+        code = record["setting_name"]
+        if not code:
+            self.blank_rows.add(row_number)
+            return
+        self.rows[row_number] = record
+        bisect.insort(self.row_numbers.setdefault(code, []), row_number)
+        if record["idempotency_key"]:
+            self.keys.add(record["idempotency_key"])
+        if record["password"]:
+            self.by_password.setdefault(hash_password(record["password"]), {})[row_number] = record
+
+    def get(self, code):
+        # 활동 코드의 첫 행 레코드, 없으면 None
+        numbers = self.row_numbers.get(code)
+        return self.rows[numbers[0]] if numbers else None
+
+    def codes(self):
+        return list(self.row_numbers)
+
+    def records(self):
+        # 모든 레코드 (시트 순서, 같은 코드의 행도 모두 포함)
+        return [self.rows[number] for number in sorted(self.rows)]
+
+    def list_by_password(self, password):
+        owned = self.by_password.get(hash_password(password), {})
+        return [owned[number] for number in sorted(owned)]
+
+    def _forget(self, number):
+        record = self.rows.pop(number)
+        numbers = self.row_numbers[record["setting_name"]]
+        numbers.remove(number)
+        if not numbers:
+            del self.row_numbers[record["setting_name"]]
+        self.keys.discard(record["idempotency_key"])
+        if record["password"]:
+            owned = self.by_password.get(hash_password(record["password"]), {})
+            owned.pop(number, None)
+            if not owned:
+                self.by_password.pop(hash_password(record["password"]), None)
+
+    def remove_rows(self, numbers):
+        # 시트에서 지운 행 번호들을 반영: 해당 행의 레코드를 빼고, 남은 행의 번호를 위에서 지운 행 수만큼 올림
+        deleted = sorted(set(numbers))
+        self.changes += 1
+        for number in deleted:
+            if number in self.rows:
+                self._forget(number)
+            self.blank_rows.discard(number)
+
+        def shift(number):
+            return number - bisect.bisect_left(deleted, number)
+
+        self.rows = {shift(number): record for number, record in self.rows.items()}
+        self.blank_rows = {shift(number) for number in self.blank_rows}
+        self.row_numbers = {code: [shift(number) for number in rows] for code, rows in self.row_numbers.items()}
+        self.by_password = {
+            password_hash: {shift(number): record for number, record in owned.items()}
+            for password_hash, owned in self.by_password.items()
+        }
+        last_deleted = self.row_count in deleted
+        self.row_count -= len([number for number in deleted if number <= self.row_count])
+        if last_deleted:
+            # 마지막 행을 지웠으면 새 마지막 행의 체크섬을 색인에서 찾음 (빈 행이면 알 수 없음)
+            last = self.rows.get(self.row_count)
+            self.last_checksum = _row_checksum(record_to_row(last)) if last else None
+
+
+class SheetsStore(ActivityStore):
+    # 워크시트마다 처음 한 번만 전체 행을 읽어 SheetIndex 를 만들고,
+    # 이후 저장/삭제할 때마다 색인을 함께 갱신합니다.
+    # 동기화 주기가 지나면 마지막으로 확인한 행부터 끝까지만 읽어 새로 추가된 행을 색인에 더합니다.
+    def __init__(self, get_worksheet, spreadsheet_name=None,
+                 sync_interval=DEFAULT_SYNC_INTERVAL, full_reload_interval=DEFAULT_FULL_RELOAD_INTERVAL):
+        self._get_worksheet = get_worksheet
+        self._spreadsheet_name = spreadsheet_name
+        self._sync_interval = sync_interval
+        self._full_reload_interval = full_reload_interval
+        self._lock = threading.RLock()
+        self._indexes = {}  # 워크시트 이름 -> SheetIndex
+        self._load_locks = {}  # 워크시트 이름 -> 처음 읽기를 한 번만 하도록 막는 잠금
+        self._new_codes = []  # 동기화로 새로 발견했지만 아직 sync() 로 전달하지 않은 코드
+
+    def _load(self, sheet):
+        values = self._get_worksheet(sheet).get_all_values()
+        return SheetIndex(values[1:], header=values[0] if values else None)
+
+    def _index(self, sheet):
+        with self._lock:
+            if sheet in self._indexes:
+                if time.time() - self._indexes[sheet].synced_at >= self._sync_interval:
+                    self._sync(sheet)
+                return self._indexes[sheet]
+            load_lock = self._load_locks.setdefault(sheet, threading.Lock())
+        # 처음 읽기는 저장소 전체 잠금 밖에서 하여 여러 워크시트를 동시에 읽을 수 있도록 함
+        # (저장/삭제 중인 스레드가 전체 잠금을 잡은 채 이 잠금을 기다릴 수 있으므로, 여기서는 전체 잠금을 다시 잡지 않음)
+        with load_lock:
+            index = self._indexes.get(sheet)
+            if index is None:
+                index = self._indexes.setdefault(sheet, self._load(sheet))
+            return index
+
+    def _sync(self, sheet, raise_errors=False):
+        # 마지막으로 확인한 행부터 끝까지 읽어, 그 행이 그대로이면 아래에 추가된 행만 색인에 더함
+        # 그 행이 없어졌거나 바뀌었으면 (위쪽 행 삭제 또는 수정) 전체를 다시 읽음
+        index = self._indexes[sheet]
+        index.synced_at = time.time()
+        try:
+            if index.last_checksum is None or time.time() - index.loaded_at >= self._full_reload_interval:
+                self._reload(sheet)
+                return
+            values = self._get_worksheet(sheet).get_values(f"A{index.row_count}:F")
+            if not values or _row_checksum(values[0]) != index.last_checksum:
+                self._reload(sheet)
+                return
+        except Exception as e:
+            if raise_errors:
+                raise
+            # 동기화에 실패해도 이전 색인으로 계속 응답하고, 다음 주기에 다시 시도
+            logger.warning("%s 워크시트를 동기화하지 못했습니다: %s", sheet, e)
+            return
+        new_rows = values[1:]
+        for offset, row in enumerate(new_rows):
+            record = row_to_record(row)
+            if record["setting_name"] and record["setting_name"] not in index.row_numbers:
+                self._new_codes.append(record["setting_name"])
+            index.add(index.row_count + 1 + offset, record)
+        if new_rows:
+            index.track(index.row_count + len(new_rows), new_rows[-1])
+
+    def _reload(self, sheet):
+        old = self._indexes.get(sheet)
+        index = self._indexes[sheet] = self._load(sheet)
+        self._new_codes.extend(code for code in index.row_numbers if old is None or code not in old.row_numbers)
+
+    def sync(self):
+        # 동기화 주기가 지난 활동 워크시트를 동기화하고, 마지막 호출 이후 새로 발견한 코드를 돌려줌
+        with self._lock:
+            for sheet in ACTIVITY_SHEETS:
+                index = self._indexes.get(sheet)
+                if index is not None and time.time() - index.synced_at >= self._sync_interval:
+                    self._sync(sheet)
+            codes, self._new_codes = self._new_codes, []
+            return codes
+
+    def _invalidate(self, sheet):
+        with self._lock:
+            self._indexes.pop(sheet, None)
+
+    def reload(self, sheet):
+        # 색인을 버려 다음 조회 때 워크시트를 다시 읽도록 함 (예: 다른 저장소에서 옮긴 행이 기록되었는지 확인할 때)
+        self._invalidate(sheet)
+
+    def insert_many(self, sheet, rows):
+        # 일시적인 오류는 다시 시도하고, 다시 시도하기 전에는 색인을 새로 읽어
+        # 실패한 줄 알았던 요청이 실제로는 기록된 경우 같은 행을 또 쓰지 않도록 함
+        call_with_retry(
+            lambda: self._append_new_rows(sheet, rows),
+            on_retry=lambda error, attempt: self._invalidate(sheet)
+        )
+
+    def _append_new_rows(self, sheet, rows):
+        # 이미 기록된 행을 거르는 것과 색인 갱신만 잠금 안에서 하고, 속도 제한 대기와 기록(append_rows)은 잠금 밖에서 하여
+        # 기록을 기다리는 동안 같은 저장소의 조회/삭제가 막히지 않도록 함
+        with self._lock:
+            index = self._index(sheet)
+            rows = [row for row in rows if not _already_saved(index.keys, row)]
+            changes = index.changes
+        if not rows:
+            return
+        response = self._get_worksheet(sheet).append_rows(rows)
+        start_row = _appended_start_row(response)
+        with self._lock:
+            if start_row is None or self._indexes.get(sheet) is not index or index.changes != changes:
+                # 기록된 위치를 알 수 없거나, 기록하는 동안 다른 곳에서 색인이 바뀌었으면 (동기화, 삭제 등)
+                # 행 번호가 맞지 않을 수 있으므로 다음 조회 때 색인을 다시 만듦
+                self._invalidate(sheet)
+                return
+            for offset, row in enumerate(rows):
+                index.add(start_row + offset, row_to_record(row))
+            if start_row + len(rows) - 1 >= index.row_count:
+                index.track(start_row + len(rows) - 1, rows[-1])
+
+    def get(self, code):
+        for sheet in ACTIVITY_SHEETS:
+            record = self._index(sheet).get(code)
+            if record is not None:
+                return sheet, record
+        return None
+
+    def list_by_password(self, sheet, password):
+        return self._index(sheet).list_by_password(password)
+
+    def records(self, sheet):
+        return self._index(sheet).records()
+
+    def codes(self, sheet):
+        # 색인을 아직 만들지 않은 워크시트(예: 보관용)는 B열만 읽음
+        with self._lock:
+            index = self._indexes.get(sheet)
+        if index is not None:
+            return index.codes()
+        return [code for code in self._get_worksheet(sheet).col_values(2)[1:] if code]
+
+    def delete_many(self, sheet, codes, drop_blank=False, password_hash=None):
+        # 지울 행 번호를 색인에서 모두 찾은 뒤, batch_update 한 번으로 아래 구간부터 지우고 색인을 그 자리에서 고침
+        # 먼저 동기화하여 다른 곳에서 위쪽 행이 지워졌는지 확인 (지워졌으면 전체를 다시 읽어 행 번호를 맞춤)
+        # 같은 코드가 여러 행에 있으면 모두 지우고, drop_blank 이면 활동 코드(B열)가 빈 행도 함께 지움
+        # password_hash 를 주면 그 비밀번호로 저장한 행(index.by_password)만 지움
+        # (구간 삭제는 다시 시도하면 다른 행이 지워질 수 있으므로 재시도하지 않음)
+        with self._lock:
+            if sheet in self._indexes:
+                self._sync(sheet, raise_errors=True)
+            index = self._index(sheet)
+            rows_of = {}  # 코드 -> 지울 행 번호
+            for code in dict.fromkeys(codes):
+                numbers = index.row_numbers.get(code, [])
+                if password_hash is not None:
+                    owned = index.by_password.get(password_hash, {})
+                    numbers = [number for number in numbers if number in owned]
+                if numbers:
+                    rows_of[code] = numbers
+            found = list(rows_of)
+            numbers = {number for code_numbers in rows_of.values() for number in code_numbers}
+            if drop_blank:
+                numbers.update(index.blank_rows)
+            if not numbers:
+                return []
+            try:
+                self._get_worksheet(sheet).delete_row_ranges(_contiguous_runs(sorted(numbers)))
+            except Exception:
+                self._invalidate(sheet)
+                raise
+            index.remove_rows(numbers)
+            return found
+
+    def ensure_sheet(self, sheet):
+        ensure_worksheet(sheet, spreadsheet_name=self._spreadsheet_name, header=FIELDS)
+
+    def delete(self, sheet, code, password_hash=None):
+        # 일시적인 오류는 색인을 새로 읽은 뒤 다시 시도
+        # 실패한 줄 알았던 삭제 요청이 실제로는 반영되어 코드가 없어졌다면 삭제된 것으로 처리
+        sent = []
+        deleted = call_with_retry(
+            lambda: self._delete_row(sheet, code, sent, password_hash),
+            on_retry=lambda error, attempt: self._invalidate(sheet)
+        )
+        return deleted or bool(sent)
+
+    def _delete_row(self, sheet, code, sent, password_hash=None):
+        with self._lock:
+            for attempt in range(2):
+                index = self._index(sheet)
+                numbers = index.row_numbers.get(code, [])
+                if password_hash is not None:
+                    # 같은 코드의 행 중 그 비밀번호로 저장한 행만 고름
+                    owned = index.by_password.get(password_hash, {})
+                    numbers = [number for number in numbers if number in owned]
+                if not numbers:
+                    return False
+                worksheet = self._get_worksheet(sheet)
+                row_number = numbers[0]
+                # 다른 곳에서 시트가 바뀌었을 수 있으므로 지울 행 하나만 읽어 코드와 비밀번호가 맞는지 확인
+                row = worksheet.row_values(row_number)
+                if len(row) > 1 and row[1] == code and (
+                    password_hash is None or (len(row) > 4 and row[4] and hash_password(row[4]) == password_hash)
+                ):
+                    sent.append(row_number)
+                    worksheet.delete_rows(row_number)
+                    index.remove_rows([row_number])
+                    return True
+                self._invalidate(sheet)
+            return False
+
+    def all_codes(self):
+        # 아직 읽지 않은 워크시트는 공용 스레드 풀에서 동시에 읽음
+        codes = []
+        for index in run_all(self._index, ACTIVITY_SHEETS):
+            codes.extend(index.codes())
+        return codes
+
+
+class SQLiteStore(ActivityStore):
+    def __init__(self, path):
+        self._path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS activities (
+                    sheet TEXT NOT NULL,
+                    timestamp TEXT,
+                    setting_name TEXT NOT NULL,
+                    prompt TEXT,
+                    email TEXT,
+                    password TEXT,
+                    password_hash TEXT,
+                    idempotency_key TEXT
+                )
+            """)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_activities_code ON activities (setting_name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_activities_password_hash ON activities (sheet, password_hash)")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_activities_idempotency_key ON activities (idempotency_key)")
+
+    def _connect(self):
+        # sqlite3 연결은 스레드 간에 공유할 수 없으므로 스레드마다 하나씩 사용
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def insert_many(self, sheet, rows):
+        records = [row_to_record(row) for row in rows]
+        with self._connect() as conn:
+            # 이미 기록된 저장 요청 키의 행은 건너뜀
+            keys = [record["idempotency_key"] for record in records if record["idempotency_key"]]
+            saved = set()
+            if keys:
+                placeholders = ", ".join("?" * len(keys))
+                saved = {row[0] for row in conn.execute(
+                    f"SELECT idempotency_key FROM activities WHERE idempotency_key IN ({placeholders})", keys
+                )}
+            conn.executemany(
+                "INSERT INTO activities (sheet, timestamp, setting_name, prompt, email, password, idempotency_key, password_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._values(sheet, record) for record in records if record["idempotency_key"] not in saved]
+            )
+
+    def _values(self, sheet, record):
+        password_hash = hash_password(record["password"]) if record["password"] else None
+        idempotency_key = record["idempotency_key"] or None
+        return [sheet] + record_to_row(record)[:-1] + [idempotency_key, password_hash]
+
+    def get(self, code):
+        row = self._connect().execute(
+            "SELECT sheet, timestamp, setting_name, prompt, email, password FROM activities WHERE setting_name = ?",
+            (code,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], row_to_record(row[1:])
+
+    def list_by_password(self, sheet, password):
+        rows = self._connect().execute(
+            "SELECT timestamp, setting_name, prompt, email, password FROM activities WHERE sheet = ? AND password_hash = ? ORDER BY rowid",
+            (sheet, hash_password(password))
+        ).fetchall()
+        return [row_to_record(row) for row in rows]
+
+    def delete(self, sheet, code, password_hash=None):
+        query = "DELETE FROM activities WHERE sheet = ? AND setting_name = ?"
+        params = [sheet, code]
+        if password_hash is not None:
+            query += " AND password_hash = ?"
+            params.append(password_hash)
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+        return cursor.rowcount > 0
+
+    def all_codes(self):
+        return [row[0] for row in self._connect().execute("SELECT setting_name FROM activities")]
+
+    def records(self, sheet):
+        rows = self._connect().execute(
+            "SELECT timestamp, setting_name, prompt, email, password, idempotency_key FROM activities WHERE sheet = ? ORDER BY rowid",
+            (sheet,)
+        ).fetchall()
+        return [row_to_record(["" if value is None else value for value in row]) for row in rows]
+
+    def delete_many(self, sheet, codes, drop_blank=False, password_hash=None):
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            return []
+        condition = f"sheet = ? AND setting_name IN ({', '.join('?' * len(codes))})"
+        params = [sheet] + codes
+        if password_hash is not None:
+            condition += " AND password_hash = ?"
+            params.append(password_hash)
+        with self._connect() as conn:
+            found = list(dict.fromkeys(
+                row[0] for row in conn.execute(f"SELECT setting_name FROM activities WHERE {condition}", params)
+            ))
+            conn.execute(f"DELETE FROM activities WHERE {condition}", params)
+        return found
+
+    def code_exists(self, code):
+        return self._connect().execute("SELECT 1 FROM activities WHERE setting_name = ?", (code,)).fetchone() is not None
+
+    def move(self, source, target, records, drop_blank=False):
+        # 행의 시트 이름만 바꾸므로 한 트랜잭션 안에서 옮겨지고, 활동 코드와 저장 요청 키가 두 행에 생기지 않음
+        codes = list(dict.fromkeys(record["setting_name"] for record in records if record["setting_name"]))
+        if not codes:
+            return []
+        placeholders = ", ".join("?" * len(codes))
+        with self._connect() as conn:
+            moved = [row[0] for row in conn.execute(
+                f"SELECT setting_name FROM activities WHERE sheet = ? AND setting_name IN ({placeholders})", [source] + codes
+            )]
+            conn.execute(f"UPDATE activities SET sheet = ? WHERE sheet = ? AND setting_name IN ({placeholders})", [target, source] + codes)
+        return moved
+
+
+class ShardedStore(ActivityStore):
+    # 활동 코드로 샤드(스프레드시트)를 정해 해당 샤드의 SheetsStore 에만 요청
+    # 비밀번호로 조회할 때만 모든 샤드를 확인합니다.
+    def __init__(self, router, stores):
+        self.router = router
+        self.stores = stores  # 스프레드시트 이름 -> SheetsStore
+
+    def store_for(self, code):
+        return self.stores[self.router.shard_for(code)]
+
+    def insert_many(self, sheet, rows):
+        groups = {}
+        for row in rows:
+            groups.setdefault(self.router.shard_for(row_to_record(row)["setting_name"]), []).append(row)
+        for name, shard_rows in groups.items():
+            self.stores[name].insert_many(sheet, shard_rows)
+
+    def get(self, code):
+        return self.store_for(code).get(code)
+
+    def list_by_password(self, sheet, password):
+        records = []
+        for shard_records in run_all(lambda name: self.stores[name].list_by_password(sheet, password), self.router.shard_names):
+            records.extend(shard_records)
+        return records
+
+    def delete(self, sheet, code, password_hash=None):
+        return self.store_for(code).delete(sheet, code, password_hash)
+
+    def all_codes(self):
+        # 샤드마다 동시에 읽음
+        codes = []
+        for shard_codes in run_all(lambda name: self.stores[name].all_codes(), self.router.shard_names):
+            codes.extend(shard_codes)
+        return codes
+
+    def code_exists(self, code):
+        return self.store_for(code).code_exists(code)
+
+    def records(self, sheet):
+        records = []
+        for shard_records in run_all(lambda name: self.stores[name].records(sheet), self.router.shard_names):
+            records.extend(shard_records)
+        return records
+
+    def codes(self, sheet):
+        codes = []
+        for name in self.router.shard_names:
+            codes.extend(self.stores[name].codes(sheet))
+        return codes
+
+    def delete_many(self, sheet, codes, drop_blank=False, password_hash=None):
+        groups = {}
+        for code in codes:
+            groups.setdefault(self.router.shard_for(code), []).append(code)
+        deleted = []
+        for name in self.router.shard_names:
+            if groups.get(name) or drop_blank:
+                deleted.extend(self.stores[name].delete_many(sheet, groups.get(name, []), drop_blank, password_hash))
+        return deleted
+
+    def move(self, source, target, records, drop_blank=False):
+        # 한 활동은 같은 샤드 안에서만 옮김
+        groups = {}
+        for record in records:
+            groups.setdefault(self.router.shard_for(record["setting_name"]), []).append(record)
+        moved = []
+        for name in self.router.shard_names:
+            if groups.get(name) or drop_blank:
+                moved.extend(self.stores[name].move(source, target, groups.get(name, []), drop_blank))
+        return moved
+
+    def ensure_sheet(self, sheet):
+        for name in self.router.shard_names:
+            self.stores[name].ensure_sheet(sheet)
+
+    def sync(self):
+        codes = []
+        for name in self.router.shard_names:
+            codes.extend(self.stores[name].sync())
+        return codes
+
+
+def sheets_store(spreadsheet_name=None):
+    # 스프레드시트 하나의 SheetsStore (이름을 생략하면 [google] spreadsheet_name)
+    return SheetsStore(
+        lambda sheet: open_worksheet(sheet, spreadsheet_name=spreadsheet_name),
+        spreadsheet_name,
+        sync_interval=float(get_setting("sync", "interval", DEFAULT_SYNC_INTERVAL)),
+        full_reload_interval=float(get_setting("sync", "full_reload_interval", DEFAULT_FULL_RELOAD_INTERVAL))
+    )
+
+
+def make_sheets_store():
+    # [google] shard_names 가 있으면 샤드별 저장소를, 없으면 스프레드시트 하나의 저장소를 만듦
+    shard_names = get_shard_names()
+    if not shard_names:
+        return sheets_store()
+    return ShardedStore(ShardRouter(shard_names), {name: sheets_store(name) for name in shard_names})
+
+
+class MirroredStore(ActivityStore):
+    # 주 저장소에 먼저 기록하고, 보조 저장소(예: Google Sheets)에도 복사
+    # 보조 저장소의 오류는 기록만 하고 주 저장소의 결과를 그대로 사용합니다.
+    def __init__(self, primary, mirror):
+        self._primary = primary
+        self._mirror = mirror
+
+    def _copy(self, method, *args):
+        try:
+            getattr(self._mirror, method)(*args)
+        except Exception:
+            logger.exception("보조 저장소에 %s 을(를) 반영하지 못했습니다.", method)
+
+    def insert_many(self, sheet, rows):
+        self._primary.insert_many(sheet, rows)
+        self._copy("insert_many", sheet, rows)
+
+    def get(self, code):
+        return self._primary.get(code)
+
+    def list_by_password(self, sheet, password):
+        return self._primary.list_by_password(sheet, password)
+
+    def delete(self, sheet, code, password_hash=None):
+        deleted = self._primary.delete(sheet, code, password_hash)
+        if deleted:
+            self._copy("delete", sheet, code, password_hash)
+        return deleted
+
+    def all_codes(self):
+        return self._primary.all_codes()
+
+    def code_exists(self, code):
+        return self._primary.code_exists(code)
+
+    def records(self, sheet):
+        return self._primary.records(sheet)
+
+    def codes(self, sheet):
+        return self._primary.codes(sheet)
+
+    def delete_many(self, sheet, codes, drop_blank=False, password_hash=None):
+        codes = list(codes)
+        deleted = self._primary.delete_many(sheet, codes, drop_blank, password_hash)
+        self._copy("delete_many", sheet, codes, drop_blank, password_hash)
+        return deleted
+
+    def move(self, source, target, records, drop_blank=False):
+        records = list(records)
+        moved = self._primary.move(source, target, records, drop_blank)
+        self._copy("move", source, target, [record for record in records if record["setting_name"] in moved], drop_blank)
+        return moved
+
+    def ensure_sheet(self, sheet):
+        self._primary.ensure_sheet(sheet)
+        self._copy("ensure_sheet", sheet)
+
+    def sync(self):
+        return self._primary.sync()
+
+
+class PublishingStore(ActivityStore):
+    # 저장/삭제한 활동을 학생용 앱의 스냅샷 파일(utils.snapshot)에도 반영
+    def __init__(self, store, publisher):
+        self._store = store
+        self.publisher = publisher
+
+    def insert_many(self, sheet, rows):
+        self._store.insert_many(sheet, rows)
+        for row in rows:
+            record = row_to_record(row)
+            self.publisher.put(sheet, record["setting_name"], record["prompt"])
+
+    def get(self, code):
+        return self._store.get(code)
+
+    def list_by_password(self, sheet, password):
+        return self._store.list_by_password(sheet, password)
+
+    def delete(self, sheet, code, password_hash=None):
+        deleted = self._store.delete(sheet, code, password_hash)
+        if deleted and sheet in ACTIVITY_SHEETS and not (password_hash is not None and self._store.code_exists(code)):
+            self.publisher.remove(code)
+        return deleted
+
+    def all_codes(self):
+        return self._store.all_codes()
+
+    def code_exists(self, code):
+        return self._store.code_exists(code)
+
+    def records(self, sheet):
+        return self._store.records(sheet)
+
+    def codes(self, sheet):
+        return self._store.codes(sheet)
+
+    def delete_many(self, sheet, codes, drop_blank=False, password_hash=None):
+        codes = list(codes)
+        deleted = self._store.delete_many(sheet, codes, drop_blank, password_hash)
+        if sheet in ACTIVITY_SHEETS:
+            for code in deleted:
+                # 비밀번호로 골라 지웠으면 다른 교사의 같은 코드 행이 남아 있을 수 있으므로 확인 후 제거
+                if password_hash is not None and self._store.code_exists(code):
+                    continue
+                self.publisher.remove(code)
+        return deleted
+
+    def move(self, source, target, records, drop_blank=False):
+        records = list(records)
+        moved = self._store.move(source, target, records, drop_blank)
+        prompts = {record["setting_name"]: record["prompt"] for record in records}
+        for code in moved:
+            if target in ACTIVITY_SHEETS:
+                self.publisher.put(target, code, prompts[code])
+            elif source in ACTIVITY_SHEETS:
+                self.publisher.remove(code)
+        return moved
+
+    def ensure_sheet(self, sheet):
+        self._store.ensure_sheet(sheet)
+
+    def sync(self):
+        codes = self._store.sync()
+        if codes:
+            # 다른 서버가 저장한 활동
+            self.publisher.request_rebuild()
+        return codes
+
+
+@st.cache_resource(show_spinner=False)
+def get_store():
+    backend = get_setting("storage", "backend", "sheets")
+    if backend == "sqlite":
+        store = SQLiteStore(get_setting("storage", "sqlite_path") or data_path("activities.sqlite3"))
+        if get_setting("storage", "mirror_to_sheets", False):
+            store = MirroredStore(store, make_sheets_store())
+    else:
+        store = make_sheets_store()
+    # [snapshot] path 가 있으면 학생용 앱이 읽는 스냅샷 파일도 함께 갱신
+    publisher = make_snapshot_publisher(store)
+    return PublishingStore(store, publisher) if publisher else store